@@ -5,53 +5,80 @@ Wires static files, fonts, and the layout. No business logic here.
 """
 from __future__ import annotations
 
+import hashlib
 import os
-import sys
 
-# Ensure components are importable
-sys.path.insert(0, os.path.dirname(__file__))
+from nicegui import app, ui
 
-from components.layout import create_layout
+_HERE    = os.path.dirname(os.path.abspath(__file__))
+_CSS_DIR = os.path.join(_HERE, "css")
+_JS_DIR  = os.path.join(_HERE, "js")
+
+# Serve static CSS/JS — URLs carry a content hash, so browsers may cache them for a year.
+# No precompressed variants needed: ui.run() installs GZipMiddleware, which already
+# compresses CSS and JS on the wire (the PNG logo is compressed data and gains nothing).
+_STATIC_MAX_AGE = 31536000
+app.add_static_files("/css", _CSS_DIR, max_cache_age=_STATIC_MAX_AGE)
+app.add_static_files("/js",  _JS_DIR,  max_cache_age=_STATIC_MAX_AGE)
+
+
+def _asset_version(path: str) -> str:
+    """Short content hash of a static file, used as a cache-busting query."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def _css_version(name: str) -> str:
+    return _asset_version(os.path.join(_CSS_DIR, name))
 
-# PDF availability check imported from pdf_exporter (canonical implementation)
-from components.pdf_exporter import _weasyprint_ok
-from nicegui import app, ui
 
-# Serve static CSS
-app.add_static_files("/css", os.path.join(os.path.dirname(__file__), "css"))
+# TODO:  theme switching and buddle separate CSS files
+_THEME_VERSION = _css_version("theme.css")
+_EDITOR_JS_VERSION = _asset_version(os.path.join(_JS_DIR, "editor.js"))
+
+
+# Every face listed is rendered by theme.css (the italics included).
+# Keep in sync with FONTS_URL in fetch_fonts.py
+_FONTS_URL = (
+    "https://fonts.googleapis.com/css2"
+    "?family=Atkinson+Hyperlegible:ital,wght@0,400;0,700;1,400"
+    "&family=Crimson+Text:ital,wght@0,400;0,600;1,400"
+    "&display=swap"
+)
+
+# Self-hosted copy written by fetch_fonts.py — avoids two third-party origins
+_LOCAL_FONTS_CSS = os.path.join(_CSS_DIR, "fonts.css")
+
+if os.path.exists(_LOCAL_FONTS_CSS):
+    _FONTS_HEAD_HTML = f'<link rel="stylesheet" href="/css/fonts.css?v={_css_version("fonts.css")}">'
+else:
+    _FONTS_HEAD_HTML = (
+        '<link rel="preconnect" href="https://fonts.googleapis.com">'
+        '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>'
+        # Preloaded so the font CSS does not block first paint
+        f'<link rel="preload" as="style" href="{_FONTS_URL}" onload="this.onload=null;this.rel=\'stylesheet\'">'
+        f'<noscript><link rel="stylesheet" href="{_FONTS_URL}"></noscript>'
+    )
+
+# Head HTML is constant — assemble once at import, not per request
+_HEAD_HTML = (
+    _FONTS_HEAD_HTML
+    + "<meta name='viewport' content='width=device-width, initial-scale=1, maximum-scale=1'>"
+    # Theme CSS (linked, not inlined, so it is fetched once and cached)
+    f'<link rel="stylesheet" href="/css/theme.css?v={_THEME_VERSION}">'
+    # Editor handlers — one cached file instead of a script sent over the websocket
+    # per page; defer runs it after parsing, and it waits for the editor to mount
+    f'<script defer src="/js/editor.js?v={_EDITOR_JS_VERSION}"></script>'
+)
 
 
 @ui.page("/")
 async def main():
-    # ── Fonts
-    ui.add_head_html("""
-        <link rel="preconnect" href="https://fonts.googleapis.com">
-        <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-        <link href="https://fonts.googleapis.com/css2?family=Atkinson+Hyperlegible:ital,wght@0,400;0,700;1,400&family=Crimson+Text:ital,wght@0,400;0,600;1,400&display=swap" rel="stylesheet">
-        "<meta name='viewport' content='width=device-width, initial-scale=1, maximum-scale=1'>"
-    """)
-
-
-
-    # TODO: Tally (newsletter embed)
-    ui.add_head_html('<script async src="https://tally.so/embed.js"></script>')
-
-    # Theme CSS
-    # TODO:  theme switching and buddle separate CSS files
-    with open(os.path.join(os.path.dirname(__file__), "css", "theme.css")) as f:
-        ui.add_css(f.read())
-
-    # NiceGUI content area reset
-    ui.add_css("""
-        .nicegui-content {
-            height: 100vh !important;
-            width: 100vw !important;
-            padding: 0 !important;
-            margin: 0 !important;
-            background: transparent !important;
-            overflow: hidden !important;
-        }
-    """)
+    # Deferred so importing app.py doesn't pull in every component (and its deps).
+    # Resolves because `python app.py` puts this directory on sys.path.
+    from components.layout import create_layout
+
+    ui.add_head_html(_HEAD_HTML)
 
     create_layout()
 
@@ -60,7 +87,7 @@ if __name__ in {"__main__", "__mp_main__"}:
     port = int(os.getenv("PORT", 8080))
     ui.run(
         title="Glass Box — TWFF",
-        favicon=os.path.join(os.path.dirname(__file__), "glassbox_logo.png"),
+        favicon=os.path.join(_HERE, "glassbox_logo.png"),
         dark=False,
         reload=True, # ? switch to True for development, but it causes issues with multiprocessing on Windows
         host="0.0.0.0",
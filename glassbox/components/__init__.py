@@ -0,0 +1,6 @@
+"""
+components — Glass Box UI components and TWFF core.
+
+No eager re-exports: import submodules directly so that, e.g., process_log
+can be used without pulling in NiceGUI.
+"""
@@ -2,34 +2,66 @@
 command_palette.py — Glass Box Command Palette (Ctrl+K / Cmd+K)
 """
 from __future__ import annotations
+import unicodedata
 from typing import TYPE_CHECKING, Callable
 from nicegui import ui
 
 if TYPE_CHECKING:
-    from components.editor import Editor
+    from .editor import Editor
 
-def _cmd(label: str, icon: str, group: str, shortcut: str = "") -> dict:
-    return {"label": label, "icon": icon, "group": group, "shortcut": shortcut}
+def _normalize(text: str) -> str:
+    """Lowercase and strip diacritics so queries match labels loosely."""
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+
+def _char_mask(text: str) -> int:
+    """64-bit set of the characters in text — a cheap prefilter before substring search."""
+    mask = 0
+    for ch in text:
+        mask |= 1 << (ord(ch) & 63)
+    return mask
+
+def _cmd(label: str, icon: str, group: str, shortcut: str = "", action: str = "") -> dict:
+    """action: name of the Editor method the command runs ("" = not implemented yet)."""
+    label_norm = _normalize(label)
+    return {"label": label, "icon": icon, "group": group, "shortcut": shortcut,
+            "action": action,
+            "label_norm": label_norm, "char_mask": _char_mask(label_norm)}
 
 ALL_COMMANDS: list[dict] = [
-    _cmd("Paraphrase selection",     "auto_fix_high",        "AI",     "Alt+P"),
-    _cmd("Continue writing",         "arrow_forward",        "AI",     "Alt+C"),
-    _cmd("Quote & cite selection",   "format_quote",         "AI",     "Alt+Q"),
-    _cmd("Improve clarity",          "spellcheck",           "AI"),
-    _cmd("Export as .twff",          "folder_zip",           "Export", "Ctrl+S"),
-    _cmd("Export as PDF",            "picture_as_pdf",       "Export"),
-    _cmd("Word count",               "format_list_numbered", "View"),
-    _cmd("Toggle ghost completion",  "auto_awesome",         "View",   "Tab"),
-    _cmd("Clear annotations",        "clear_all",            "Edit"),
+    _cmd("Paraphrase selection",     "auto_fix_high",        "AI",     "Alt+P",  "cmd_paraphrase_selection"),
+    _cmd("Continue writing",         "arrow_forward",        "AI",     "Alt+C",  "cmd_continue_writing"),
+    _cmd("Quote & cite selection",   "format_quote",         "AI",     "Alt+Q",  "cmd_quote_and_cite"),
+    _cmd("Improve clarity",          "spellcheck",           "AI",     "",       "cmd_paraphrase_selection"),
+    _cmd("Export as .twff",          "folder_zip",           "Export", "Ctrl+S", "export_twff"),
+    _cmd("Export as PDF",            "picture_as_pdf",       "Export", "",       "export_pdf"),
+    _cmd("Word count",               "format_list_numbered", "View",   "",       "cmd_show_word_count"),
+    _cmd("Toggle ghost completion",  "auto_awesome",         "View",   "Tab",    "cmd_toggle_ghost"),
+    _cmd("Clear annotations",        "clear_all",            "Edit",   "",       "cmd_clear_annotations"),
 ]
 
+# Groups are static — index them once, in declaration order
+COMMAND_GROUPS: dict[str, list[dict]] = {}
+for _c in ALL_COMMANDS:
+    COMMAND_GROUPS.setdefault(_c["group"], []).append(_c)
+del _c
+
+QUERY_DEBOUNCE = 0.04   # seconds — rapid keystrokes collapse into one filter pass
+
 class CommandPalette:
     def __init__(self, editor: "Editor"):
         self._editor = editor
         self._dialog = None
         self._input  = None
         self._results_container = None
-        self._filtered = list(ALL_COMMANDS)
+        self._filtered = ALL_COMMANDS
+        self._last_sig: tuple[int, ...] | None = None
+        self._pending_q = ""
+        self._debounce_timer = None
+        self._keyboard = None
+        # Bound editor methods, resolved once per palette rather than per click
+        self._routes: dict[str, Callable] = {
+            c["action"]: getattr(editor, c["action"]) for c in ALL_COMMANDS if c["action"]
+        }
 
     def build(self) -> None:
         with ui.dialog().props("seamless position='top'") as self._dialog:
@@ -44,40 +76,67 @@ class CommandPalette:
                 ui.separator().classes("my-0")
                 self._results_container = ui.column().classes("cp-results w-full")
                 self._render_results()
-        ui.keyboard(on_key=self._on_key)
+        # One listener per page; keydown only — keyup would double the websocket traffic
+        if self._keyboard is None:
+            self._keyboard = ui.keyboard(on_key=self._on_key).props("events=['keydown']")
 
     def open(self) -> None:
         if not self._dialog:
             return
-        self._filtered = list(ALL_COMMANDS)
-        if self._input:
+        self._cancel_pending_query()
+        if self._input and self._input.value:
             self._input.set_value("")
-        self._render_results()
+        # Rows are still those of the unfiltered list unless a query narrowed them
+        if self._filtered is not ALL_COMMANDS:
+            self._filtered = ALL_COMMANDS
+            self._render_results()
         self._dialog.open()
 
     def close(self) -> None:
+        self._cancel_pending_query()
         if self._dialog:
             self._dialog.close()
 
     def _on_query(self, e) -> None:
-        q = (e.value or "").lower()
-        self._filtered = (
-            [c for c in ALL_COMMANDS if q in c["label"].lower()] if q
-            else list(ALL_COMMANDS)
-        )
+        self._pending_q = _normalize(e.value or "")
+        self._cancel_pending_query()
+        self._debounce_timer = ui.timer(QUERY_DEBOUNCE, self._apply_pending_query, once=True)
+
+    def _cancel_pending_query(self) -> None:
+        if self._debounce_timer:
+            self._debounce_timer.cancel()
+            self._debounce_timer = None
+
+    def _apply_pending_query(self) -> None:
+        self._debounce_timer = None
+        q = self._pending_q
+        if q:
+            qmask = _char_mask(q)
+            self._filtered = [
+                c for c in ALL_COMMANDS
+                if (c["char_mask"] & qmask) == qmask and q in c["label_norm"]
+            ]
+        else:
+            self._filtered = ALL_COMMANDS
         self._render_results()
 
     def _render_results(self) -> None:
+        # Identical result set → the rendered rows are already correct
+        sig = tuple(id(c) for c in self._filtered)
+        if sig == self._last_sig:
+            return
+        self._last_sig = sig
         self._results_container.clear()
         if not self._filtered:
             with self._results_container:
                 ui.label("No commands found").classes("cp-empty")
             return
-        groups: dict[str, list[dict]] = {}
-        for cmd in self._filtered:
-            groups.setdefault(cmd["group"], []).append(cmd)
+        surviving = set(sig)
         with self._results_container:
-            for group_name, cmds in groups.items():
+            for group_name, group_cmds in COMMAND_GROUPS.items():
+                cmds = [c for c in group_cmds if id(c) in surviving]
+                if not cmds:
+                    continue
                 ui.label(group_name).classes("cp-group-label")
                 for cmd in cmds:
                     self._render_row(cmd)
@@ -85,31 +144,19 @@ class CommandPalette:
     def _render_row(self, cmd: dict) -> None:
         def _execute(c=cmd):
             self.close()
-            self._dispatch(c["label"])
+            self._dispatch(c)
         with ui.row().classes("cp-cmd-row items-center w-full cursor-pointer").on("click", _execute):
             ui.icon(cmd["icon"], size="16px").classes("cp-cmd-icon")
             ui.label(cmd["label"]).classes("cp-cmd-label flex-1")
             if cmd.get("shortcut"):
                 ui.label(cmd["shortcut"]).classes("cp-cmd-shortcut")
 
-    def _dispatch(self, label: str) -> None:
-        ed = self._editor
-        routes: dict[str, Callable] = {
-            "Paraphrase selection":    ed.cmd_paraphrase_selection,
-            "Continue writing":        ed.cmd_continue_writing,
-            "Quote & cite selection":  ed.cmd_quote_and_cite,
-            "Improve clarity":         ed.cmd_paraphrase_selection,
-            "Export as .twff":         ed.export_twff,
-            "Export as PDF":           ed.export_pdf,
-            "Word count":              ed.cmd_show_word_count,
-            "Toggle ghost completion": ed.cmd_toggle_ghost,
-            "Clear annotations":       ed.cmd_clear_annotations,
-        }
-        fn = routes.get(label)
+    def _dispatch(self, cmd: dict) -> None:
+        fn = self._routes.get(cmd["action"])
         if fn:
             ui.timer(0.05, fn, once=True)
         else:
-            ui.notify(f"'{label}' — coming soon", type="info", position="top-right")
+            ui.notify(f"'{cmd['label']}' — coming soon", type="info", position="top-right")
 
     def _on_key(self, e) -> None:
         if e.action.keydown:
@@ -10,23 +10,88 @@ fixes in this version:
 from __future__ import annotations
 
 import asyncio
-import os
-import sys
+import concurrent.futures
+import functools
+import html as _html_mod
+import re
+import time
 
-import bleach
-from components.ollama_client import OllamaClient
-from components.process_log import ANNOTATION_TYPES, ProcessLog
-from nicegui import ui
+import orjson   # installed with nicegui
+from nicegui import run, ui
 
-# Canonical PDF engine check
+from .ollama_client import MAX_GHOST_TOKENS, OllamaClient
+from .process_log import ANNOTATION_TYPES, ProcessLog
+
+# Canonical PDF engine check (cached in pdf_exporter)
 try:
-    from components.pdf_exporter import PDFExporter, _reportlab_ok, _weasyprint_ok
-    def _pdf_ok() -> bool:
-        return _weasyprint_ok() or _reportlab_ok()
+    from .pdf_exporter import PDFExporter, _pdf_export_ok
 except ImportError:
-    def _pdf_ok() -> bool:
+    def _pdf_export_ok() -> bool:
         return False
 
+# Optional C-backed HTML parser for text extraction; regex fallback below
+try:
+    from selectolax.lexbor import LexborHTMLParser as _HTMLParser
+except ImportError:
+    _HTMLParser = None
+
+# Optional Rust-backed sanitizer for the PDF preview
+try:
+    import nh3
+except ImportError:
+    nh3 = None
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE  = re.compile(r"\s+")
+# Annotated spans are inline — line breaks become spaces in one pass
+_INLINE_TEXT = str.maketrans("\r\n", "  ")
+
+# One PDF render at a time, off the default executor shared with run.io_bound —
+# a large export neither starves other handlers nor stacks WeasyPrint jobs
+_PDF_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="gb-pdf")
+
+CONTENT_DEBOUNCE = 0.25   # seconds — word/char stats refresh after typing pauses
+TAIL_CHARS       = 2048   # plain-text context kept for AI prompts
+
+# Checkpoints follow editing: after this many content changes, or on the first
+# change once this many seconds have passed. Idle sessions log nothing.
+CHECKPOINT_EDITS    = 50
+CHECKPOINT_INTERVAL = 60.0
+
+# Editor toolbar — annotation slots are named after their CSS class
+_TOOLBAR_PROP = (
+    ':toolbar="['
+    "['bold','italic','underline','subscript','superscript'],"
+    "['h1','h2','h3'],"
+    "['unordered','ordered'],"
+    "['blockquote','code'],"
+    "['ann-paraphrase','ann-generated','ann-external'],"
+    "['export-twff','export-pdf'],"
+    ']"'
+)
+_ANN_SLOTS = [
+    (ANNOTATION_TYPES[key]["css_class"], ANNOTATION_TYPES[key])
+    for key in ("ai_paraphrase", "ai_generated", "external_paste")
+]
+
+# What the editor toolbar can produce, plus annotation spans — everything else
+# is dropped from the preview
+_PREVIEW_TAGS = frozenset({
+    "p", "div", "br", "h1", "h2", "h3", "b", "strong", "i", "em", "u",
+    "sub", "sup", "ul", "ol", "li", "blockquote", "pre", "code", "span", "a",
+})
+_PREVIEW_ATTRS = {
+    "span": frozenset({"class", "data-tooltip"}),
+    "a":    frozenset({"href", "title"}),
+}
+
+# Offline stand-ins inserted by _demo_insert, by annotation type
+_DEMO_FIXTURES = {
+    "ai_paraphrase":  "This sentence was rewritten by an AI to improve clarity.",
+    "ai_generated":   "This paragraph was drafted entirely by an AI assistant.",
+    "external_paste": "This content was pasted from an external source.",
+}
+
 #  PDF Templates
 
 PDF_TEMPLATES = {
@@ -44,14 +109,31 @@ class Editor:
         self.word_count: int = 0
         self.char_count: int = 0
         self.editor_ref      = None
+        self._content_debounce: asyncio.TimerHandle | None = None
+        # Last TAIL_CHARS of plain text, refreshed with the stats, so AI
+        # prompts don't re-strip the whole document
+        self._plain_tail: str = ""
+        # HTML and plain text the current word/char counts were computed from
+        self._stats_html: str = ""
+        self._plain:      str = ""
+        self._edits_since_ckpt = 0
+        self._last_ckpt        = time.monotonic()
+        self._last_ckpt_snap: tuple[int, int] | None = None
+        # True until self.content is known to match the browser (initial value
+        # never fires on_change; script-driven inserts bypass it too)
+        self._content_stale = True
 
         # AI
-        self.ollama        = OllamaClient()
-        self.ghost_enabled = True
-        self._selected_text = ""
+        self.ollama           = OllamaClient()
+        self.ghost_enabled    = True
+        self.ghost_max_tokens = MAX_GHOST_TOKENS   # num_predict cap per ghost request
+        self._selected_text   = ""
+        self._ghost_task: asyncio.Task | None = None
 
         # TWFF
         self.process_log = ProcessLog()
+        self._paste_note  = None      # live paste toast, updated during a burst
+        self._paste_burst = [0, 0]    # pastes, chars shown in that toast
 
         # Export meta
         self._doc_title       = "Untitled Document"
@@ -60,9 +142,12 @@ class Editor:
         self._pdf_template    = "academic"
 
         # UI refs
+        self._events_bound = False
         self._status_label = None
         self._model_select = None
         self._export_pdf_button = None
+        self._export_dialog     = None
+        self._export_meta_label = None
 
     #  Build UI
 
@@ -70,10 +155,15 @@ class Editor:
         with ui.column().classes("editor-container w-full h-full flex flex-col"):
             self._build_editor()
 
+        # ui.on handlers are page-wide and never removed — rebuilding this
+        # editor must not stack a second copy of each (double-logged pastes)
+        if self._events_bound:
+            return
+        self._events_bound = True
         self._attach_paste_handler()
         self._attach_selection_capture()
         self._attach_ghost_completion()
-        ui.timer(30.0, self._on_checkpoint)
+        ui.on("gb_blur", self._on_checkpoint)
 
     def build_model_selector(self) -> None:
         """
@@ -118,31 +208,18 @@ class Editor:
     #  Editor core ─
 
     def _build_editor(self) -> None:
-        toolbar = (
-            ':toolbar="['
-            "['bold','italic','underline','subscript','superscript'],"
-            "['h1','h2','h3'],"
-            "['unordered','ordered'],"
-            "['blockquote','code'],"
-            "['ann-paraphrase','ann-generated','ann-external'],"
-            "['export-twff','export-pdf'],"
-            ']"'
-        )
-
         self.editor_ref = ui.editor(
             placeholder="Start writing here. Your process is being recorded.",
             value=self._initial_content(),
             on_change=self._on_content_change,
-        ).props(toolbar).classes("w-full h-full border-0")
+        ).props(_TOOLBAR_PROP).classes("w-full h-full border-0")
 
         # Annotation toolbar buttons
-        for ann_key in ("ai_paraphrase", "ai_generated", "external_paste"):
-            ann    = ANNOTATION_TYPES[ann_key]
-            suffix = ann_key.split("_")[1]
-            with self.editor_ref.add_slot(f"ann-{suffix}"):
+        for slot, ann in _ANN_SLOTS:
+            with self.editor_ref.add_slot(slot):
                 ui.button(
                     ann["label"],
-                    on_click=lambda a=ann: self._run_annotation_ai(a),
+                    on_click=functools.partial(self._run_annotation_ai, ann),
                 ).props("flat dense").classes("ann-toolbar-btn")
 
         with self.editor_ref.add_slot("export-twff"):
@@ -153,65 +230,23 @@ class Editor:
             self._export_pdf_button = ui.button(
                 "PDF Preview", on_click=self.export_pdf,
             ).props("flat dense").classes("ann-toolbar-btn export-btn-pdf")
-            if not _pdf_ok():
-                self._export_pdf_button.props(add="disable")
-                self._export_pdf_button.tooltip = (
-                    "Install reportlab: pip install reportlab"
-                )
+
+        # Engine probing can shell out (find_library) — render the button
+        # optimistically and check after first paint
+        ui.timer(0.0, self._check_pdf_engine, once=True)
+
+    async def _check_pdf_engine(self) -> None:
+        if not await run.io_bound(_pdf_export_ok):
+            self._export_pdf_button.props(add="disable")
+            self._export_pdf_button.tooltip("Install reportlab: pip install reportlab")
 
     #  Paste — no blocking browser dialogs
 
     def _attach_paste_handler(self) -> None:
         """
-        Intercept paste. Inserts annotated span at cursor position.
-        Sends event to Python for logging. NO browser confirm() or prompt().
+        Log pastes intercepted in the browser (see js/editor.js), which
+        inserts an annotated span at the cursor. NO browser confirm() or prompt().
         """
-        ui.run_javascript("""
-        (function() {
-            setTimeout(function() {
-                const ed = document.querySelector(
-                    '.q-editor__content[contenteditable="true"]'
-                );
-                if (!ed) return;
-
-                ed.addEventListener('paste', function(e) {
-                    e.preventDefault();
-                    const cd  = e.clipboardData || window.clipboardData;
-                    const txt = cd.getData('text/plain') || '';
-                    if (!txt) return;
-
-                    const span = document.createElement('span');
-                    span.className = 'ann-external';
-                    span.setAttribute('data-tooltip',
-                        'External paste — ' + new Date().toISOString());
-                    span.textContent = txt;   // plain text only — XSS safe
-
-                    const sel = window.getSelection();
-                    if (sel && sel.rangeCount) {
-                        const range = sel.getRangeAt(0);
-                        range.deleteContents();
-                        range.insertNode(span);
-                        range.setStartAfter(span);
-                        range.collapse(true);
-                        sel.removeAllRanges();
-                        sel.addRange(range);
-                    } else {
-                        ed.appendChild(span);
-                    }
-
-                    window.emitEvent('gb_paste', {
-                        length:  txt.length,
-                        preview: txt.substring(0, 100)
-                    });
-
-                    // Sync content back to Python
-                    window.emitEvent('gb_content_sync',
-                        {html: ed.innerHTML});
-                });
-            }, 700);
-        })();
-        """)
-
         def _handle_paste(e) -> None:
             data    = e.args or {}
             length  = data.get("length", 0)
@@ -224,16 +259,25 @@ class Editor:
                 source="external",
                 preview=preview,
             )
-            # Show a non-blocking NiceGUI notification
-            ui.notify(
-                f"Pasted {length} chars — logged as external source",
-                type="info", position="top-right", timeout=3000,
-            )
+            # Non-blocking notification; a burst of pastes updates one toast
+            # instead of stacking a new one per paste
+            note = self._paste_note
+            if note is not None and not note.is_deleted:
+                self._paste_burst[0] += 1
+                self._paste_burst[1] += length
+                count, chars = self._paste_burst
+                note.message = f"Pasted {count}× ({chars} chars) — logged as external source"
+            else:
+                self._paste_burst = [1, length]
+                self._paste_note  = ui.notification(
+                    f"Pasted {length} chars — logged as external source",
+                    type="info", position="top-right", timeout=3,
+                    on_dismiss=lambda: setattr(self, "_paste_note", None),
+                )
 
         def _handle_sync(e) -> None:
-            html = (e.args or {}).get("html", "")
-            if html:
-                self._on_content_change({"value": html})
+            # DOM changed outside Quasar's v-model — self.content is stale until pulled
+            self._content_stale = True
 
         ui.on("gb_paste",        _handle_paste)
         ui.on("gb_content_sync", _handle_sync)
@@ -241,20 +285,6 @@ class Editor:
     #  Selection capture ─
 
     def _attach_selection_capture(self) -> None:
-        ui.run_javascript("""
-        (function() {
-            setTimeout(function() {
-                document.addEventListener('mouseup', function() {
-                    const sel = window.getSelection();
-                    const txt = sel ? sel.toString().trim() : '';
-                    if (txt.length > 0) {
-                        window.emitEvent('gb_selection', {text: txt});
-                    }
-                });
-            }, 700);
-        })();
-        """)
-
         def _handle_selection(e) -> None:
             self._selected_text = (e.args or {}).get("text", "")
 
@@ -272,110 +302,40 @@ class Editor:
 
         Ghost is rendered as a <span id="gb-ghost"> styled via CSS:
           italic, muted colour, not selectable, positioned inline.
+        Key handling lives in js/editor.js; this wires the Python side.
         """
-        ui.run_javascript("""
-        (function() {
-            setTimeout(function() {
-                const ed = document.querySelector(
-                    '.q-editor__content[contenteditable="true"]'
-                );
-                if (!ed) return;
-
-                let ghostNode = null;
-
-                function removeGhost() {
-                    if (ghostNode && ghostNode.parentNode) {
-                        ghostNode.parentNode.removeChild(ghostNode);
-                    }
-                    ghostNode = null;
-                }
-
-                // Called from Python with the ghost text
-                window._gbShowGhost = function(text) {
-                    removeGhost();
-                    if (!text) return;
-                    const sel = window.getSelection();
-                    if (!sel || !sel.rangeCount) return;
-                    const range = sel.getRangeAt(0).cloneRange();
-                    range.collapse(false);   // collapse to cursor end
-
-                    ghostNode = document.createElement('span');
-                    ghostNode.id = 'gb-ghost';
-                    ghostNode.className = 'gb-ghost-text';
-                    ghostNode.contentEditable = 'false';
-                    ghostNode.setAttribute('aria-hidden', 'true');
-                    ghostNode.textContent = text;
-
-                    range.insertNode(ghostNode);
-
-                    // Restore cursor to before the ghost
-                    const r2 = document.createRange();
-                    r2.setStartBefore(ghostNode);
-                    r2.collapse(true);
-                    sel.removeAllRanges();
-                    sel.addRange(r2);
-                };
-
-                window._gbAcceptGhost = function() {
-                    if (!ghostNode) return '';
-                    const text = ghostNode.textContent;
-                    const parent = ghostNode.parentNode;
-                    const textNode = document.createTextNode(text);
-                    parent.replaceChild(textNode, ghostNode);
-                    ghostNode = null;
-                    // Move cursor after accepted text
-                    const sel = window.getSelection();
-                    const r = document.createRange();
-                    r.setStartAfter(textNode);
-                    r.collapse(true);
-                    sel.removeAllRanges();
-                    sel.addRange(r);
-                    return text;
-                };
-
-                ed.addEventListener('keydown', function(e) {
-                    if (e.key === 'Tab') {
-                        e.preventDefault();
-                        if (ghostNode) {
-                            const accepted = window._gbAcceptGhost();
-                            window.emitEvent('gb_ghost_accepted', {text: accepted});
-                            window.emitEvent('gb_content_sync', {html: ed.innerHTML});
-                        } else {
-                            // Request ghost from Python
-                            const ctx = ed.innerText || '';
-                            if (ctx.trim().length >= 8) {
-                                window.emitEvent('gb_ghost_request', {context: ctx});
-                            }
-                        }
-                    } else if (e.key === 'Escape') {
-                        removeGhost();
-                    } else if (!e.ctrlKey && !e.metaKey && !e.altKey
-                               && e.key.length === 1) {
-                        // Regular typing dismisses ghost
-                        removeGhost();
-                    }
-                });
-            }, 700);
-        })();
-        """)
-
         async def _handle_ghost_request(e) -> None:
             if not self.ghost_enabled:
                 return
             ctx = (e.args or {}).get("context", "")
             if len(ctx.strip()) < 8:
                 return
+            # Latest request wins: cancel a completion still in flight
+            if self._ghost_task and not self._ghost_task.done():
+                self._ghost_task.cancel()
+            self._ghost_task = asyncio.current_task()
             try:
                 if self.ollama.status.available:
-                    text = await self.ollama.ghost_completion(ctx)
+                    # Show tokens as they arrive instead of waiting for the
+                    # whole completion
+                    ui.run_javascript('window._gbShowGhost("");')
+                    async for chunk in self.ollama.ghost_completion_stream(
+                            ctx, max_tokens=self.ghost_max_tokens):
+                        ui.run_javascript(f"window._gbAppendGhost({_js_literal(chunk)});")
                 else:
                     text = OllamaClient.fallback_completion(ctx)
-                if text:
-                    ui.run_javascript(f"window._gbShowGhost({repr(text)});")
+                    if text:
+                        ui.run_javascript(f"window._gbShowGhost({_js_literal(text)});")
             except Exception:
                 pass  # Ghost is best-effort
 
+        def _cancel_ghost(_=None) -> None:
+            if self._ghost_task and not self._ghost_task.done():
+                self._ghost_task.cancel()
+            self._ghost_task = None
+
         async def _handle_ghost_accepted(e) -> None:
+            _cancel_ghost()
             text = (e.args or {}).get("text", "")
             if text:
                 pos = self.char_count
@@ -391,6 +351,7 @@ class Editor:
 
         ui.on("gb_ghost_request",  _handle_ghost_request)
         ui.on("gb_ghost_accepted", _handle_ghost_accepted)
+        ui.on("gb_ghost_dismiss",  _cancel_ghost)
 
     #  AI toolbar actions
 
@@ -413,7 +374,8 @@ class Editor:
             position="top-right",
         )
         try:
-            ctx = self._strip_html(self.content)[-800:]
+            await self._sync_content()
+            ctx = self._plain_tail[-800:]
             if ann["interaction"] == "paraphrase":
                 src    = self._selected_text or self._last_paragraph(ctx)
                 result = await self.ollama.paraphrase(src)
@@ -438,13 +400,8 @@ class Editor:
             notif.dismiss()
 
     def _demo_insert(self, ann: dict) -> None:
-        fixtures = {
-            "ai_paraphrase":  "This sentence was rewritten by an AI to improve clarity.",
-            "ai_generated":   "This paragraph was drafted entirely by an AI assistant.",
-            "external_paste": "This content was pasted from an external source.",
-        }
         key  = next((k for k, v in ANNOTATION_TYPES.items() if v == ann), "")
-        text = fixtures.get(key, "Sample annotated content.")
+        text = _DEMO_FIXTURES.get(key, "Sample annotated content.")
         self._insert_annotated_at_cursor(text, ann, f"{ann['label']} — demo")
         pos = self.char_count
         if ann["log_type"] == "ai_interaction":
@@ -458,34 +415,10 @@ class Editor:
             )
 
     def _insert_annotated_at_cursor(self, text: str, ann: dict, tooltip: str) -> None:
-        css          = ann["css_class"]
-        safe_text    = text.replace("\\", "\\\\").replace("'", "\\'").replace("\n", " ")
-        safe_tooltip = tooltip.replace("'", "\\'")
-        ui.run_javascript(f"""
-        (function() {{
-            const ed = document.querySelector(
-                '.q-editor__content[contenteditable="true"]'
-            );
-            if (!ed) return;
-            const span = document.createElement('span');
-            span.className = '{css}';
-            span.setAttribute('data-tooltip', '{safe_tooltip}');
-            span.textContent = '{safe_text}';
-            const sel = window.getSelection();
-            if (sel && sel.rangeCount) {{
-                const range = sel.getRangeAt(0);
-                range.collapse(false);
-                range.insertNode(span);
-                range.setStartAfter(span);
-                range.collapse(true);
-                sel.removeAllRanges();
-                sel.addRange(range);
-            }} else {{
-                ed.appendChild(span);
-            }}
-            window.emitEvent('gb_content_sync', {{html: ed.innerHTML}});
-        }})();
-        """)
+        payload = _js_literal({
+            "text": text.translate(_INLINE_TEXT), "css": ann["css_class"], "tooltip": tooltip,
+        })
+        ui.run_javascript(f"window._gbInsertAnnotated({payload});")
 
     #  Command palette hooks ─
 
@@ -509,8 +442,8 @@ class Editor:
             async def _analyse():
                 try:
                     if self.ollama.status.available:
-                        res  = await self.ollama.quote_and_cite(
-                            selection, self._strip_html(self.content))
+                        await self._sync_content()
+                        res  = await self.ollama.quote_and_cite(selection, self._plain_tail)
                         result_label.set_text(f'Quoted: {res.get("quoted", selection)}')
                         needs = res.get("needs_citation", True)
                         sugg  = res.get("suggestion", "")
@@ -533,8 +466,9 @@ class Editor:
                 ui.button("Close", on_click=dlg.close).props("flat")
         dlg.open()
 
-    def cmd_show_word_count(self) -> None:
-        ai_count = sum(1 for e in self.process_log.events if e["type"] == "ai_interaction")
+    async def cmd_show_word_count(self) -> None:
+        await self._sync_content()
+        ai_count = self.process_log.type_counts["ai_interaction"]
         with ui.dialog() as dlg, ui.card().classes("post-export-dialog"):
             ui.label("Document Stats").classes("dialog-title")
             with ui.column().classes("gap-1"):
@@ -554,29 +488,21 @@ class Editor:
         )
 
     def cmd_clear_annotations(self) -> None:
-        ui.run_javascript("""
-        (function() {
-            const ed = document.querySelector('.q-editor__content[contenteditable="true"]');
-            if (!ed) return;
-            ed.querySelectorAll('.ann-paraphrase,.ann-generated,.ann-external,.ann-completion')
-              .forEach(span => span.parentNode.replaceChild(
-                  document.createTextNode(span.textContent), span));
-            window.emitEvent('gb_content_sync', {html: ed.innerHTML});
-        })();
-        """)
+        ui.run_javascript("window._gbClearAnnotations();")
         ui.notify("Annotations cleared", position="top-right")
 
     #  Export
 
-    def export_twff(self) -> None:
-        xhtml      = self._wrap_xhtml(self.editor_ref.value or "")
+    async def export_twff(self) -> None:
+        xhtml      = self._wrap_xhtml(await self._sync_content())
         twff_bytes = self.process_log.export(xhtml)
         ui.download(twff_bytes, "document.twff")
         ui.notify("TWFF exported", type="positive", position="top-right")
         self._show_export_dialog()
 
-    def export_pdf(self) -> None:
+    async def export_pdf(self) -> None:
         """Show PDF preview + metadata + template selector before exporting."""
+        await self._sync_content()
         self._show_pdf_preview_dialog()
 
     def _show_pdf_preview_dialog(self) -> None:
@@ -635,9 +561,7 @@ class Editor:
                     ui.separator()
 
                     # Stats summary
-                    ai_count = sum(
-                        1 for e in self.process_log.events if e["type"] == "ai_interaction"
-                    )
+                    ai_count = self.process_log.type_counts["ai_interaction"]
                     ui.label("Session Stats").classes("text-xs font-bold uppercase tracking-wider text-gray-500")
                     ui.label(f"{self.word_count:,} words").classes("text-xs text-gray-600")
                     ui.label(f"{ai_count} AI interactions").classes("text-xs text-gray-600")
@@ -659,10 +583,10 @@ class Editor:
                         dlg.close()
                         try:
                             exporter  = PDFExporter(process_log=self.process_log)
-                            pdf_bytes = await asyncio.get_event_loop().run_in_executor(
-                                None,
+                            pdf_bytes = await asyncio.get_running_loop().run_in_executor(
+                                _PDF_POOL,
                                 lambda: exporter.export(
-                                    html_content=self.editor_ref.value or "",
+                                    html_content=self.content,
                                     title=self._doc_title,
                                     author=self._doc_author,
                                     institution=self._doc_institution,
@@ -691,7 +615,7 @@ class Editor:
                     )
                     # Inline preview of annotated HTML
                     preview_html = self._build_preview_html(
-                        self.editor_ref.value or "",
+                        _sanitize_preview(self.content),
                         self._doc_title,
                         self._doc_author,
                         self._doc_institution,
@@ -708,7 +632,7 @@ class Editor:
     ) -> str:
         """Build an HTML preview of the document with annotation highlights."""
         import datetime
-        now = datetime.datetime.utcnow().strftime("%B %d, %Y")
+        now = datetime.datetime.now(datetime.timezone.utc).strftime("%B %d, %Y")
         meta = ""
         if title:       meta += f"<p style='margin:0;font-size:.9rem;color:#666'><strong>Title:</strong> {title}</p>"
         if author:      meta += f"<p style='margin:0;font-size:.9rem;color:#666'><strong>Author:</strong> {author}</p>"
@@ -731,23 +655,23 @@ class Editor:
 """
 
     def _show_export_dialog(self) -> None:
-        """Post-export TWFF dialog with Tally newsletter embed."""
-        with ui.dialog() as dlg, ui.card().classes("post-export-dialog"):
-            ui.label("Session exported").classes("dialog-title")
-            ui.label(
-                f"Session {self.process_log.session_id[:8]}… — "
-                f"{len(self.process_log.events)} events recorded"
-            ).classes("dialog-meta")
-            ui.html("""
-                <iframe scrolling="no"
-                    style="overflow:hidden;width:100%;height:168px;border:none;"
-                    data-tally-src="https://tally.so/embed/jaQNE9?hideTitle=1&transparentBackground=1&dynamicHeight=1"
-                    loading="lazy" frameborder="0" title="FIRL Newsletter"></iframe>
-            """, sanitize=False)
-            ui.run_javascript("if (typeof Tally !== 'undefined') { Tally.loadEmbeds(); }")
-            with ui.row().classes("w-full justify-end mt-2"):
-                ui.button("Close", on_click=dlg.close).props("flat")
-        dlg.open()
+        """Post-export TWFF dialog with Tally newsletter embed. Built once, reopened after."""
+        if self._export_dialog is None:
+            with ui.dialog() as dlg, ui.card().classes("post-export-dialog"):
+                ui.label("Session exported").classes("dialog-title")
+                self._export_meta_label = ui.label("").classes("dialog-meta")
+                ui.html(_TALLY_IFRAME, sanitize=False)
+                with ui.row().classes("w-full justify-end mt-2"):
+                    ui.button("Close", on_click=dlg.close).props("flat")
+            # Quasar mounts dialog content on each open — (re)load the embed
+            # once it is in the DOM, client-side, without a server round-trip
+            dlg.on("show", js_handler="() => window._gbLoadTally()")
+            self._export_dialog = dlg
+        self._export_meta_label.set_text(
+            f"Session {self.process_log.session_id[:8]}… — "
+            f"{len(self.process_log.events)} events recorded"
+        )
+        self._export_dialog.open()
 
     #  Model change
 
@@ -767,22 +691,92 @@ class Editor:
             self.content = e.value
         elif isinstance(e, dict):
             self.content = e.get("value", "")
-        plain           = self._strip_html(self.content)
-        self.word_count = len(plain.split()) if plain.strip() else 0
-        self.char_count = len(plain)
-
-    def _on_checkpoint(self) -> None:
-        self.process_log.log_checkpoint(
-            char_count=self.char_count,
-            word_count=self.word_count,
-            cursor_position=self.char_count,
+        self._content_stale = False
+        # Trailing debounce: recount once the burst of change events settles
+        if self._content_debounce:
+            self._content_debounce.cancel()
+        self._content_debounce = asyncio.get_running_loop().call_later(
+            CONTENT_DEBOUNCE, self._flush_content_change,
         )
 
+    def _flush_content_change(self) -> None:
+        self._content_debounce = None
+        edit = _plain_edit(self._stats_html, self._plain, self.content) if self._plain else None
+        if edit is None:
+            plain, self.word_count, self.char_count = _text_stats(self.content)
+        else:
+            # Text-only edit: re-count just the words around the change
+            plain, start, old_end, new_end = edit
+            self.word_count += (_words_around(plain, start, new_end)
+                                - _words_around(self._plain, start, old_end))
+            self.char_count = len(plain)
+        self._stats_html, self._plain = self.content, plain
+        self._plain_tail = plain[-TAIL_CHARS:]
+        self._edits_since_ckpt += 1
+        if (self._edits_since_ckpt >= CHECKPOINT_EDITS
+                or time.monotonic() - self._last_ckpt > CHECKPOINT_INTERVAL):
+            self._log_checkpoint()
+
+    async def _sync_content(self) -> str:
+        """Pull the editor's HTML from the browser if it changed since the last sync."""
+        if self._content_stale:
+            try:
+                html = await ui.run_javascript(
+                    "return document.querySelector("
+                    "'.q-editor__content[contenteditable=\"true\"]')?.innerHTML ?? null;",
+                    timeout=5.0,
+                )
+            except TimeoutError:
+                html = None
+            if html is not None:
+                self.content        = html
+                self._content_stale = False
+                self._flush_content_change()
+            elif self.editor_ref is not None and self.editor_ref.value is not None:
+                # Browser didn't answer — fall back to the v-model copy, which
+                # NiceGUI keeps in sync on every update:model-value. Stays
+                # stale so the next sync retries the DOM
+                self.content = self.editor_ref.value
+                self._flush_content_change()
+            else:
+                ui.notify("Could not read the editor — the document may be out of date",
+                          type="warning", position="top-right")
+        elif self._content_debounce:
+            # A recount is still pending — run it now so _plain_tail is current
+            self._content_debounce.cancel()
+            self._flush_content_change()
+        return self.content
+
+    async def _on_checkpoint(self, _=None) -> None:
+        """Editor lost focus — checkpoint any edits made since the last one."""
+        await self._sync_content()
+        if self._edits_since_ckpt:
+            self._log_checkpoint()
+
+    def _log_checkpoint(self) -> None:
+        # Edits that cancel out (typed, then deleted) would log a duplicate
+        snap = (self.word_count, self.char_count)
+        if snap != self._last_ckpt_snap:
+            self.process_log.log_checkpoint(
+                char_count=self.char_count,
+                word_count=self.word_count,
+                cursor_position=self.char_count,
+            )
+            self._last_ckpt_snap = snap
+        self._edits_since_ckpt = 0
+        self._last_ckpt        = time.monotonic()
+
     #  Helpers ─
 
     @staticmethod
     def _strip_html(html: str) -> str:
-        return bleach.clean(html, tags=[], strip=True)
+        if _HTMLParser is not None:
+            # Handles '>' inside attribute values, which the regex does not
+            return _HTMLParser(html).text(separator="") if html else ""
+        # Editor HTML comes from the browser's serializer, so a tag regex is
+        # close enough — no need for a full (pure-Python) HTML parse per keystroke
+        text = _TAG_RE.sub("", html)
+        return _html_mod.unescape(text) if "&" in text else text
 
     @staticmethod
     def _last_paragraph(text: str) -> str:
@@ -791,18 +785,130 @@ class Editor:
 
     @staticmethod
     def _wrap_xhtml(body_html: str) -> str:
-        return (
-            '<?xml version="1.0" encoding="UTF-8"?>\n'
-            '<!DOCTYPE html>\n'
-            '<html xmlns="http://www.w3.org/1999/xhtml">\n'
-            "<head><title>Glass Box Document</title></head>\n"
-            f"<body>\n{body_html}\n</body>\n"
-            "</html>"
-        )
+        return _XHTML_PRELUDE + body_html + _XHTML_POSTLUDE
 
     @staticmethod
     def _initial_content() -> str:
-        return """
+        return _INITIAL_HTML
+
+
+@functools.lru_cache(maxsize=2)
+def _sanitize_preview(html: str) -> str:
+    """
+    Allow-list the editor HTML before it is rendered in the preview dialog.
+    Memoized: reopening the preview on an unchanged document skips the parse.
+    """
+    if nh3 is None:
+        return html
+    return nh3.clean(html, tags=_PREVIEW_TAGS, attributes=_PREVIEW_ATTRS, strip_comments=True)
+
+
+def _js_literal(value) -> str:
+    """JSON-encode a value for interpolation into a run_javascript call."""
+    return orjson.dumps(value).decode()
+
+
+@functools.lru_cache(maxsize=8)
+def _text_stats(html: str) -> tuple[str, int, int]:
+    """
+    (plain text, word count, char count) for editor HTML.
+    Memoized: NiceGUI often re-emits an unchanged value.
+    """
+    plain = Editor._strip_html(html)
+    norm  = _WS_RE.sub(" ", plain).strip()
+    return plain, (norm.count(" ") + 1 if norm else 0), len(plain)
+
+
+
+def _common_prefix_len(a: str, b: str) -> int:
+    # Binary search over slice comparisons — each compare runs in C
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix_len(a: str, b: str, limit: int) -> int:
+    la, lb = len(a), len(b)
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[la - mid:la - lo] == b[lb - mid:lb - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _plain_edit(old_html: str, old_plain: str, new_html: str) -> tuple[str, int, int, int] | None:
+    """
+    Derive the plain text of new_html from old_plain when the edit between the
+    two HTML strings touched text only (the common case while typing).
+
+    Returns (new_plain, start, old_end, new_end) — the changed span in plain
+    text coordinates — or None when a full strip is needed: markup changed,
+    or the edit is not near the end of the document. Only the unchanged HTML
+    after the edit is stripped, so the cost follows the distance to the end.
+    """
+    p = _common_prefix_len(old_html, new_html)
+    q = _common_suffix_len(old_html, new_html, min(len(old_html), len(new_html)) - p)
+    old_mid = old_html[p:len(old_html) - q]
+    new_mid = new_html[p:len(new_html) - q]
+    for mid in (old_mid, new_mid):
+        if "<" in mid or ">" in mid or "&" in mid or ";" in mid:
+            return None
+    # The edit must not start inside a tag or a character reference
+    if (old_html.rfind("<", 0, p) > old_html.rfind(">", 0, p)
+            or old_html.rfind("&", 0, p) > old_html.rfind(";", 0, p)):
+        return None
+
+    # The tail must be attribute-free so a tag regex strips it exactly like
+    # the full parse does ('>' may appear unescaped inside attribute values)
+    tail = old_html[len(old_html) - q:]
+    if q > p or '"' in tail:
+        return None
+    tail_plain = _TAG_RE.sub("", tail)
+    if "&" in tail_plain:
+        tail_plain = _html_mod.unescape(tail_plain)
+    start   = len(old_plain) - len(tail_plain) - len(old_mid)
+    old_end = start + len(old_mid)
+    if start < 0 or old_plain[start:old_end] != old_mid:
+        return None
+    return old_plain[:start] + new_mid + old_plain[old_end:], start, old_end, start + len(new_mid)
+
+
+def _words_around(text: str, start: int, end: int) -> int:
+    """Word count of text[start:end] widened to the enclosing whitespace."""
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    while end < len(text) and not text[end].isspace():
+        end += 1
+    return len(text[start:end].split())
+
+
+#  Static strings — built once per process, shared by every editor
+
+_XHTML_PRELUDE = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<!DOCTYPE html>\n'
+    '<html xmlns="http://www.w3.org/1999/xhtml">\n'
+    "<head><title>Glass Box Document</title></head>\n"
+    "<body>\n"
+)
+_XHTML_POSTLUDE = "\n</body>\n</html>"
+
+_TALLY_IFRAME = (
+    '<iframe scrolling="no" '
+    'style="overflow:hidden;width:100%;height:168px;border:none;" '
+    'data-tally-src="https://tally.so/embed/jaQNE9?hideTitle=1&transparentBackground=1&dynamicHeight=1" '
+    'loading="lazy" frameborder="0" title="FIRL Newsletter"></iframe>'
+)
+
+_INITIAL_HTML = """
 <h1>Welcome to Glass Box</h1>
 <p>This editor records your writing process as a TWFF session. Every edit, paste,
 and AI interaction is logged locally — nothing leaves your machine until you export.</p>
@@ -8,11 +8,18 @@ Footer: status | word/char counts | session ID | Ctrl+K hint
 """
 from __future__ import annotations
 
-from components.command_palette import CommandPalette
-from components.editor import Editor
-from components.process_log import ANNOTATION_TYPES
 from nicegui import ui
 
+from .command_palette import CommandPalette
+from .editor import Editor
+from .process_log import ANNOTATION_TYPES
+
+# (swatch classes, label) per annotation type — built once, not per page render
+_LEGEND_ITEMS = tuple(
+    (f"gb-legend-swatch {ann['css_class']}-swatch", ann["label"])
+    for ann in ANNOTATION_TYPES.values()
+)
+
 
 def create_layout() -> None:
     editor  = Editor()
@@ -81,12 +88,10 @@ def _create_legend() -> None:
     with ui.row().classes("gb-legend w-full"):
         ui.label("Process log:").classes("gb-legend-title")
 
-        for ann in ANNOTATION_TYPES.values():
+        for swatch, label in _LEGEND_ITEMS:
             with ui.row().classes("items-center gap-1"):
-                ui.element("span").classes(
-                    f"gb-legend-swatch {ann['css_class']}-swatch"
-                )
-                ui.label(ann["label"]).classes("gb-legend-label")
+                ui.element("span").classes(swatch)
+                ui.label(label).classes("gb-legend-label")
 
         # Spacer
         ui.element("div").classes("flex-1")
@@ -10,13 +10,21 @@ All calls are async to avoid blocking the NiceGUI event loop.
 from __future__ import annotations
 
 import asyncio
-import json
+import dataclasses
 import logging
+import time
+from collections import OrderedDict
+from contextlib import aclosing
 from dataclasses import dataclass, field
 from typing import AsyncGenerator
 
 import httpx
 
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
 logger = logging.getLogger(__name__)
 
 #  Constants ─
@@ -25,7 +33,25 @@ DEFAULT_MODEL    = "qwen2.5:0.5b"
 FALLBACK_MODEL   = "tinyllama"          # second choice
 TIMEOUT_DISCOVER = 2.0                  # fast check — don't hang UI
 TIMEOUT_GENERATE = 30.0
-MAX_GHOST_TOKENS = 20                   # keep ghost completions short
+MAX_GHOST_TOKENS = 16                   # keep ghost completions short
+MAX_GHOST_CHARS  = 60
+GHOST_CONTEXT    = 200                  # trailing chars of context sent for a ghost (js/editor.js too)
+GHOST_STOP       = [".", "\n"]          # server-side stop — the ghost is cut there anyway
+GHOST_CACHE_SIZE = 128                  # completed ghosts kept per client (undo/redo repeats)
+DISCOVERY_TTL    = 15.0                 # seconds a discovery result is shared
+DISCOVERY_RETRY  = 2.0                  # ...when Ollama was unreachable, so it is found quickly
+
+# Best first. Matching is by family (the name before ":"), so any tag counts
+MODEL_PREFERENCE = (
+    "qwen2.5:0.5b",
+    "qwen2.5:1.5b",
+    "tinyllama",
+    "tinyllama:1.1b",
+    "phi3:mini",
+    "mistral:7b-instruct-q4_0",
+    "llama3.2:1b",
+)
+_PREFERRED_FAMILIES = tuple(dict.fromkeys(m.split(":")[0] for m in MODEL_PREFERENCE))
 
 
 #  Status dataclass
@@ -37,6 +63,27 @@ class OllamaStatus:
     error: str = ""
 
 
+# Discovery is shared by every client (one per editor / browser tab), keyed by base URL
+_discovery_cache: dict[str, tuple[float, OllamaStatus]] = {}   # url -> (expiry, status)
+_discovery_tasks: dict[str, asyncio.Task] = {}
+
+# One connection pool for every client — keep-alive connections to Ollama are
+# reused across editors instead of each tab opening (and leaking) its own pool
+_http_client: httpx.AsyncClient | None = None
+
+
+def _get_http() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=TIMEOUT_GENERATE,
+            transport=httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(max_keepalive_connections=8),
+            ),
+        )
+    return _http_client
+
+
 #  Client
 class OllamaClient:
     """
@@ -52,38 +99,61 @@ class OllamaClient:
     def __init__(self, base_url: str = OLLAMA_BASE):
         self.base_url    = base_url
         self.status      = OllamaStatus()
-        self._http       = httpx.AsyncClient(timeout=TIMEOUT_GENERATE)
+        # Finished ghost completions (LRU) by (model, context tail, max_tokens)
+        self._ghost_cache: OrderedDict[tuple, str] = OrderedDict()
 
     #  Discovery ─
 
     async def discover(self) -> OllamaStatus:
-        """Ping Ollama and enumerate available models. Updates self.status."""
+        """
+        Ping Ollama and enumerate available models. Updates self.status.
+        Results are shared for DISCOVERY_TTL seconds (DISCOVERY_RETRY after a
+        failure), and concurrent callers await a single in-flight probe.
+        """
+        cached = _discovery_cache.get(self.base_url)
+        if cached and time.monotonic() < cached[0]:
+            status = cached[1]
+        else:
+            task = _discovery_tasks.get(self.base_url)
+            if task is None:
+                task = asyncio.ensure_future(self._probe())
+                _discovery_tasks[self.base_url] = task
+                task.add_done_callback(lambda _: _discovery_tasks.pop(self.base_url, None))
+            # shield: one caller being cancelled must not cancel the shared probe
+            status = await asyncio.shield(task)
+        # Private copy — set_model() mutates the status in place
+        self.status = dataclasses.replace(status, models=list(status.models))
+        return self.status
+
+    async def _probe(self) -> OllamaStatus:
         try:
             resp = await asyncio.wait_for(
                 self._http.get(f"{self.base_url}/api/tags"),
                 timeout=TIMEOUT_DISCOVER,
             )
             resp.raise_for_status()
-            data   = resp.json()
+            data   = _loads(resp.content)
             models = [m["name"] for m in data.get("models", [])]
 
             # Pick best available model
             active = self._pick_model(models)
 
-            self.status = OllamaStatus(
+            status = OllamaStatus(
                 available=True,
                 models=models,
                 active_model=active,
             )
         except (httpx.ConnectError, httpx.TimeoutException, asyncio.TimeoutError):
-            self.status = OllamaStatus(
+            status = OllamaStatus(
                 available=False,
                 error="Ollama not running. Install from ollama.com and run: ollama pull qwen2.5:0.5b",
             )
         except Exception as exc:
-            self.status = OllamaStatus(available=False, error=str(exc))
+            status = OllamaStatus(available=False, error=str(exc))
 
-        return self.status
+        ttl = DISCOVERY_TTL if status.available else DISCOVERY_RETRY
+        _discovery_cache[self.base_url] = (time.monotonic() + ttl, status)
+        return status
 
     def set_model(self, model: str) -> None:
         self.status.active_model = model
@@ -96,6 +166,7 @@ class OllamaClient:
         system: str = "",
         max_tokens: int = 512,
         temperature: float = 0.7,
+        stop: list[str] | None = None,
     ) -> str:
         """Non-streaming generation. Returns full response string."""
         if not self.status.available:
@@ -112,6 +183,8 @@ class OllamaClient:
         }
         if system:
             payload["system"] = system
+        if stop:
+            payload["options"]["stop"] = stop
 
         resp = await self._http.post(
             f"{self.base_url}/api/generate",
@@ -119,13 +192,15 @@ class OllamaClient:
             timeout=TIMEOUT_GENERATE,
         )
         resp.raise_for_status()
-        return resp.json().get("response", "").strip()
+        return _loads(resp.content).get("response", "").strip()
 
     async def generate_stream(
         self,
         prompt: str,
         system: str = "",
         max_tokens: int = 512,
+        temperature: float = 0.7,
+        stop: list[str] | None = None,
     ) -> AsyncGenerator[str, None]:
         """Streaming generation — yields tokens as they arrive."""
         if not self.status.available:
@@ -135,27 +210,34 @@ class OllamaClient:
             "model":  self.status.active_model,
             "prompt": prompt,
             "stream": True,
-            "options": {"num_predict": max_tokens, "temperature": 0.7},
+            "options": {"num_predict": max_tokens, "temperature": temperature},
         }
         if system:
             payload["system"] = system
+        if stop:
+            payload["options"]["stop"] = stop
 
         async with self._http.stream(
             "POST", f"{self.base_url}/api/generate",
             json=payload, timeout=TIMEOUT_GENERATE
         ) as resp:
-            async for line in resp.aiter_lines():
-                if not line:
-                    continue
-                try:
-                    chunk = json.loads(line)
+            # NDJSON: split raw bytes ourselves and parse each line without a
+            # str decode — both loads() accept bytes
+            buf = b""
+            async for data in resp.aiter_bytes():
+                *lines, buf = (buf + data).split(b"\n")
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    try:
+                        chunk = _loads(line)
+                    except ValueError:
+                        continue
                     token = chunk.get("response", "")
                     if token:
                         yield token
                     if chunk.get("done"):
-                        break
-                except json.JSONDecodeError:
-                    continue
+                        return
 
     #  Task-specific methods ─
 
@@ -183,27 +265,83 @@ class OllamaClient:
         prompt = f"Continue this academic text:\n\n{tail}"
         return await self.generate(prompt, system=system, max_tokens=200, temperature=0.75)
 
-    async def ghost_completion(self, context: str) -> str:
+    async def ghost_completion(self, context: str, max_tokens: int = MAX_GHOST_TOKENS) -> str:
         """
         Predict the next few words for inline ghost/tab completion.
-        Returns at most MAX_GHOST_TOKENS tokens. Short and fast.
+        Returns at most max_tokens tokens. Short and fast.
+        Repeated contexts are served from cache.
+        """
+        key = self._ghost_key(context, max_tokens)
+        hit = self._ghost_cached(key)
+        if hit is not None:
+            return hit
+        # Consumes the stream so generation stops at the first sentence end
+        async with aclosing(self._ghost_tokens(context, max_tokens)) as stream:
+            result = "".join([token async for token in stream]).strip()
+        self._ghost_store(key, result)
+        return result
+
+    async def ghost_completion_stream(
+        self, context: str, max_tokens: int = MAX_GHOST_TOKENS,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Streaming variant of ghost_completion() — yields text as tokens arrive
+        so the ghost can render from the first token. Same limits and cache.
+        """
+        key = self._ghost_key(context, max_tokens)
+        hit = self._ghost_cached(key)
+        if hit is not None:
+            yield hit
+            return
+
+        parts: list[str] = []
+        async with aclosing(self._ghost_tokens(context, max_tokens)) as stream:
+            async for token in stream:
+                parts.append(token)
+                yield token
+        # Only reached when the completion ran to its end — not when the
+        # consumer closed the stream early or the task was cancelled
+        self._ghost_store(key, "".join(parts).strip())
+
+    async def _ghost_tokens(self, context: str, max_tokens: int) -> AsyncGenerator[str, None]:
+        """
+        Ghost text as it streams from Ollama. Stops at the first sentence end
+        or newline, and at ~MAX_GHOST_CHARS; leaving early closes the HTTP
+        stream, so Ollama stops generating too.
         """
         system = (
             "Complete the text with 3-8 natural words only. "
             "Return ONLY the completion words, nothing else."
         )
-        tail = context[-200:] if len(context) > 200 else context
-        prompt = f"Complete: {tail}"
-        result = await self.generate(
+        prompt  = f"Complete: {context[-GHOST_CONTEXT:]}"
+        emitted = 0    # chars yielded so far
+        pending = ""   # trailing word, held back until it is known to fit
+        async with aclosing(self.generate_stream(
             prompt, system=system,
-            max_tokens=MAX_GHOST_TOKENS, temperature=0.4
-        )
-        # Strip to first sentence fragment
-        result = result.split(".")[0].split("\n")[0].strip()
-        # Guard: don't return more than ~60 chars
-        if len(result) > 60:
-            result = result[:60].rsplit(" ", 1)[0]
-        return result
+            max_tokens=max_tokens, temperature=0.2, stop=GHOST_STOP,
+        )) as stream:
+            async for token in stream:
+                if not emitted and not pending:
+                    token = token.lstrip()
+                done = False
+                cut  = [i for i in (token.find("."), token.find("\n")) if i >= 0]
+                if cut:
+                    token, done = token[:min(cut)], True
+                text = pending + token
+                if emitted + len(text) > MAX_GHOST_CHARS:
+                    # Over the limit: end on the last whole word, never mid-word
+                    head = text[:MAX_GHOST_CHARS - emitted].rpartition(" ")[0]
+                    if head:
+                        yield head
+                    return
+                head, sep, pending = text.rpartition(" ")
+                if head or sep:
+                    emitted += len(head) + 1
+                    yield head + sep
+                if done:
+                    break
+        if pending:
+            yield pending
 
     async def quote_and_cite(self, selected_text: str, context: str) -> dict:
         """
@@ -225,8 +363,8 @@ class OllamaClient:
         # Strip markdown fences if present
         raw = raw.strip().lstrip("```json").lstrip("```").rstrip("```").strip()
         try:
-            return json.loads(raw)
-        except json.JSONDecodeError:
+            return _loads(raw)
+        except ValueError:
             return {
                 "quoted": f'"{selected_text}"',
                 "needs_citation": True,
@@ -255,25 +393,41 @@ class OllamaClient:
         words = len(context.split())
         return _CONTINUATIONS[words % len(_CONTINUATIONS)]
 
+    #  Ghost cache ─
+
+    def _ghost_key(self, context: str, max_tokens: int) -> tuple:
+        return (self.status.active_model, context[-GHOST_CONTEXT:], max_tokens)
+
+    def _ghost_cached(self, key: tuple) -> str | None:
+        hit = self._ghost_cache.get(key)
+        if hit is not None:
+            self._ghost_cache.move_to_end(key)
+        return hit
+
+    def _ghost_store(self, key: tuple, text: str) -> None:
+        if not text:
+            return   # let an empty completion be retried
+        self._ghost_cache[key] = text
+        self._ghost_cache.move_to_end(key)
+        if len(self._ghost_cache) > GHOST_CACHE_SIZE:
+            self._ghost_cache.popitem(last=False)
+
     #  Model utilities ─
 
     @staticmethod
     def _pick_model(models: list[str]) -> str:
-        """Pick the best available model from a preference list."""
-        preference = [
-            "qwen2.5:0.5b",
-            "qwen2.5:1.5b",
-            "tinyllama",
-            "tinyllama:1.1b",
-            "phi3:mini",
-            "mistral:7b-instruct-q4_0",
-            "llama3.2:1b",
-        ]
-        for preferred in preference:
-            for m in models:
-                if m.startswith(preferred.split(":")[0]):
-                    return m
+        """Pick the best available model from MODEL_PREFERENCE."""
+        by_family: dict[str, str] = {}
+        for m in models:
+            by_family.setdefault(m.split(":")[0], m)   # first listed wins
+        for family in _PREFERRED_FAMILIES:
+            if family in by_family:
+                return by_family[family]
         return models[0] if models else DEFAULT_MODEL
 
+    @property
+    def _http(self) -> httpx.AsyncClient:
+        return _get_http()
+
     async def close(self):
-        await self._http.aclose()
+        """No-op: the HTTP pool is shared by every client and lives for the process."""
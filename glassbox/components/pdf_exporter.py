@@ -16,14 +16,18 @@ Usage:
 from __future__ import annotations
 
 import datetime
+import functools
 import html as _html_mod
+import importlib.util
 import io
 import re
+import threading
 from dataclasses import dataclass
+from html.parser import HTMLParser
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from components.process_log import ProcessLog
+    from .process_log import ProcessLog
 
 # Annotation colour palette — shared by both engines
 ANN_COLOURS = {
@@ -37,8 +41,25 @@ ANN_COLOURS = {
                        "desc": "Inline tab-completion accepted"},
 }
 
-# ── Engine detection
-
+# Static chrome for the WeasyPrint HTML — identical on every export
+_LEGEND_ITEMS_HTML = "".join(
+    f'<span><span style="background:{c["hex"]};display:inline-block;'
+    f'width:8pt;height:8pt;border-radius:50%;margin-right:4pt"></span>{c["label"]}</span>'
+    for c in ANN_COLOURS.values()
+)
+_ANN_LEGEND_HTML = "".join(
+    f'<div class="legend-row"><span class="swatch" style="background:{c["hex"]}"></span>'
+    f'<strong>{c["label"]}</strong> — {c["desc"]}</div>'
+    for c in ANN_COLOURS.values()
+)
+
+# HTML → ReportLab conversion: annotation class → font colour, tag stripper
+_HEX_BY_CLASS = {cls: c["hex"] for cls, c in ANN_COLOURS.items()}
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# ── Engine detection (probed once per process)
+
+@functools.lru_cache(maxsize=None)
 def _weasyprint_ok() -> bool:
     try:
         from ctypes.util import find_library
@@ -48,25 +69,35 @@ def _weasyprint_ok() -> bool:
             (find_library("cairo-2")       or find_library("cairo"))
         ):
             return False
-        import weasyprint  # noqa: F401
-        return True
+        # find_spec, not import: WeasyPrint takes hundreds of ms to import and
+        # is only needed once an export actually runs
+        return importlib.util.find_spec("weasyprint") is not None
     except Exception:
         return False
 
 
+# Set once importing WeasyPrint has failed despite a positive probe (broken
+# install, ABI-mismatched native libs); exports then use ReportLab
+_weasyprint_broken = False
+
+
+@functools.lru_cache(maxsize=None)
 def _reportlab_ok() -> bool:
-    try:
-        import reportlab  # noqa: F401
-        return True
-    except ImportError:
-        return False
+    return importlib.util.find_spec("reportlab") is not None
 
 
+@functools.lru_cache(maxsize=None)
 def _pdf_export_ok() -> bool:
-    """Check if ANY PDF engine (WeasyPrint or ReportLab) is available."""
+    """Check if ANY PDF engine (WeasyPrint or ReportLab) is available. Cached per process."""
     return _weasyprint_ok() or _reportlab_ok()
 
 
+# Warm the probe caches in the background at import so the first page load
+# and export find the answer ready. A caller racing the thread at worst repeats
+# the probe. The engines themselves are still imported only on first export
+threading.Thread(target=_pdf_export_ok, name="gb-pdf-probe", daemon=True).start()
+
+
 # ── WeasyPrint CSS
 
 _CSS = """
@@ -114,6 +145,163 @@ th { background:#eff6ff; font-family:sans-serif; font-weight:700; font-size:9pt;
 """
 
 
+@functools.lru_cache(maxsize=None)
+def _weasy_css():
+    """Parse _CSS into a WeasyPrint stylesheet once and reuse it for every export."""
+    from weasyprint import CSS
+    return CSS(string=_CSS)
+
+
+@functools.lru_cache(maxsize=None)
+def _rl_styles() -> dict:
+    """Build the ReportLab paragraph styles once and reuse them for every export."""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    base = getSampleStyleSheet()["Normal"]
+
+    def s(name, **kw):
+        return ParagraphStyle(name, parent=base, **kw)
+
+    return {
+        "base":   base,
+        "normal": s("n",  fontName="Times-Roman",    fontSize=11.5, leading=20, spaceAfter=6),
+        "h1":     s("h1", fontName="Helvetica-Bold", fontSize=18,   leading=22, spaceAfter=8),
+        "h2":     s("h2", fontName="Helvetica-Bold", fontSize=13,   leading=17, spaceBefore=14, spaceAfter=4),
+        "h3":     s("h3", fontName="Helvetica-Bold", fontSize=11,   leading=15, spaceBefore=10, spaceAfter=3),
+        "meta":   s("m",  fontName="Helvetica",      fontSize=9,    leading=13,
+                    textColor=colors.HexColor("#6b7280"), spaceAfter=3),
+        "bq":     s("bq", fontName="Times-Italic",   fontSize=11,   leading=18,
+                    leftIndent=18, textColor=colors.HexColor("#374151"),
+                    backColor=colors.HexColor("#eff6ff"), spaceAfter=10, borderPadding=6),
+        "ap_h":   s("ah", fontName="Helvetica-Bold", fontSize=14,   leading=18, spaceAfter=12),
+        "ap_sub": s("as", fontName="Helvetica-Bold", fontSize=9,    leading=12,
+                    textColor=colors.HexColor("#6b7280"), spaceAfter=6, spaceBefore=14,
+                    textTransform="uppercase"),
+        "small":  s("sm", fontName="Times-Italic",   fontSize=8.5,  leading=12,
+                    textColor=colors.HexColor("#9ca3af"), spaceBefore=20),
+        "code":   s("co", fontName="Courier",        fontSize=9,    leading=13,
+                    textColor=colors.HexColor("#6b7280"), spaceAfter=3),
+        "legend": s("lg", fontSize=8.5),
+        "ann_key": s("ak", fontSize=10, leading=16, spaceAfter=4),
+    }
+
+
+# ── HTML → ReportLab markup
+
+class _RLBlocks(HTMLParser):
+    """
+    Single-pass walk over the editor HTML. Text is collected into ReportLab
+    paragraph markup and handed to emit(tag, markup) as each block closes;
+    annotation spans become <font color> runs on the way through.
+    """
+
+    BLOCKS = frozenset({"h1", "h2", "h3", "p", "blockquote", "li", "ul", "ol", "div"})
+    # HTML inline tag → ReportLab paragraph tag
+    INLINE = {"b": "b", "strong": "b", "i": "i", "em": "i", "u": "u",
+              "s": "strike", "strike": "strike", "sub": "sub", "sup": "sup"}
+
+    def __init__(self, emit):
+        super().__init__(convert_charrefs=True)
+        self._emit  = emit
+        self._tag: str | None = None
+        self._buf:  list[str] = []
+        # Open inline/font runs: [key, opener, closer, index of opener in _buf]
+        self._open: list[list] = []
+
+    def _flush(self):
+        # A block can end inside a run (<p><b>x</p>, or a block inside an
+        # annotation span): close the run here and reopen it in the next block
+        # so every paragraph is balanced markup
+        pending = {run[3] for run in self._open}
+        if "".join(x for i, x in enumerate(self._buf) if i not in pending).strip():
+            closers = "".join(run[2] for run in reversed(self._open))
+            self._emit(self._tag, "".join(self._buf).strip() + closers)
+        self._buf = []
+        for run in self._open:
+            run[3] = len(self._buf)
+            self._buf.append(run[1])
+
+    def _push(self, key, opener, closer):
+        self._open.append([key, opener, closer, len(self._buf)])
+        self._buf.append(opener)
+
+    def _pop(self, key):
+        for i in range(len(self._open) - 1, -1, -1):
+            if self._open[i][0] == key:
+                _, _, closer, at = self._open.pop(i)
+                if at == len(self._buf) - 1:
+                    del self._buf[at]   # empty run, e.g. one reopened just before it closed
+                else:
+                    self._buf.append(closer)
+                return
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.BLOCKS:
+            self._flush()
+            self._tag = tag
+        elif tag == "br":
+            self._buf.append("<br/>")
+        elif tag == "span":
+            col = next((_HEX_BY_CLASS[c] for c in (dict(attrs).get("class") or "").split()
+                        if c in _HEX_BY_CLASS), None)
+            if col:
+                self._push("span", f'<font color="{col}">', "</font>")
+            else:
+                self._push("span", "", "")
+        elif tag in self.INLINE:
+            rl = self.INLINE[tag]
+            self._push(rl, f"<{rl}>", f"</{rl}>")
+
+    def handle_endtag(self, tag):
+        if tag in self.BLOCKS:
+            self._flush()
+            self._tag = None
+        elif tag == "span":
+            self._pop("span")
+        elif tag in self.INLINE:
+            self._pop(self.INLINE[tag])
+
+    def handle_data(self, data):
+        # Collapse whitespace with C-level split/join; runs that touch a
+        # neighbouring inline tag keep a single space
+        text = " ".join(data.split())
+        if not text:
+            if data:
+                self._buf.append(" ")
+            return
+        if data[0].isspace():
+            text = " " + text
+        if data[-1].isspace():
+            text += " "
+        self._buf.append(_html_mod.escape(text, quote=False))
+
+    def close(self):
+        super().close()
+        self._flush()
+        self._buf, self._open = [], []
+
+
+@functools.lru_cache(maxsize=256)
+def _esc_cell(value: str) -> str:
+    """Escape a table cell. Memoised: types, models and acceptance values repeat."""
+    return _html_mod.escape(value)
+
+
+@functools.lru_cache(maxsize=8)
+def _rl_blocks(raw: str) -> tuple[tuple[str | None, str], ...]:
+    """
+    (block tag, ReportLab markup) pairs for raw. Cached so re-exporting the
+    same document (e.g. after changing only the metadata) skips the parse;
+    the Paragraphs themselves are rebuilt per export as they hold layout state.
+    """
+    blocks: list[tuple[str | None, str]] = []
+    parser = _RLBlocks(lambda tag, text: blocks.append((tag, text)))
+    parser.feed(raw)
+    parser.close()
+    return tuple(blocks)
+
+
 @dataclass
 class PDFExporter:
     process_log: "ProcessLog"
@@ -122,10 +310,29 @@ class PDFExporter:
 
     def export(self, html_content: str, title: str = "Document",
                author: str = "", institution: str = "") -> bytes:
-        if _weasyprint_ok():
-            return self._weasy(html_content, title, author, institution)
-        if _reportlab_ok():
-            return self._reportlab(html_content, title, author, institution)
+        buf = io.BytesIO()
+        self.export_to(buf, html_content, title, author, institution)
+        return buf.getvalue()
+
+    def export_to(self, fileobj, html_content: str, title: str = "Document",
+                  author: str = "", institution: str = "") -> None:
+        """Render the PDF straight into a writable binary file object."""
+        global _weasyprint_broken
+        engine = self.engine_name()
+        if engine == "WeasyPrint":
+            try:
+                # The probe only checks the package is present; the first
+                # import is what loads Pango/Cairo, so a broken install fails here
+                import weasyprint  # noqa: F401
+            except (ImportError, OSError):
+                _weasyprint_broken = True
+                engine = self.engine_name()
+            else:
+                self._weasy(fileobj, html_content, title, author, institution)
+                return
+        if engine == "ReportLab":
+            self._reportlab(fileobj, html_content, title, author, institution)
+            return
         raise RuntimeError(
             "No PDF engine found.\n"
             "  pip install reportlab          ← pure Python, works everywhere\n"
@@ -133,54 +340,40 @@ class PDFExporter:
         )
 
     def engine_name(self) -> str:
-        if _weasyprint_ok():   return "WeasyPrint"
+        if _weasyprint_ok() and not _weasyprint_broken:
+            return "WeasyPrint"
         if _reportlab_ok():    return "ReportLab"
         return "none"
 
     # ── WeasyPrint
 
-    def _weasy(self, content, title, author, institution) -> bytes:
-        from weasyprint import CSS, HTML
+    def _weasy(self, target, content, title, author, institution) -> None:
+        from weasyprint import HTML
         body = self._build_html(content, title, author, institution, engine="WeasyPrint")
-        return HTML(string=body).write_pdf(stylesheets=[CSS(string=_CSS)])
+        HTML(string=body).write_pdf(target=target, stylesheets=[_weasy_css()])
 
     def _build_html(self, content, title, author, institution, engine="") -> str:
         esc = _html_mod.escape
-        now = datetime.datetime.utcnow().strftime("%B %d, %Y")
-        meta_fields = [f"<div><strong>Title:</strong> {esc(title)}</div>"]
+        title_e = esc(title)
+        now = datetime.datetime.now(datetime.timezone.utc).strftime("%B %d, %Y")
+        meta_fields = [f"<div><strong>Title:</strong> {title_e}</div>"]
         if author:      meta_fields.append(f"<div><strong>Author:</strong> {esc(author)}</div>")
         if institution: meta_fields.append(f"<div><strong>Institution:</strong> {esc(institution)}</div>")
         meta_fields.append(f"<div><strong>Date:</strong> {now}</div>")
         meta_fields.append(f"<div><strong>Session:</strong> {self.process_log.session_id[:8]}…</div>")
 
-        legend_items = "".join(
-            f'<span><span style="background:{c["hex"]};display:inline-block;'
-            f'width:8pt;height:8pt;border-radius:50%;margin-right:4pt"></span>{c["label"]}</span>'
-            for c in ANN_COLOURS.values()
-        )
-
         stats = self._stats()
-        ai_events = [e for e in self.process_log.events if e["type"] == "ai_interaction"]
-        ai_rows = "".join(
-            f"<tr><td>{e['timestamp'][11:19]}</td>"
-            f"<td>{e.get('meta',{}).get('interaction_type','—')}</td>"
-            f"<td>{e.get('meta',{}).get('model','—')}</td>"
-            f"<td>{e.get('meta',{}).get('output_length','—')} ch</td>"
-            f"<td>{e.get('meta',{}).get('acceptance','—')}</td></tr>"
-            for e in ai_events
-        ) or "<tr><td colspan='5'>No AI interactions recorded</td></tr>"
-
-        ann_legend = "".join(
-            f'<div class="legend-row"><span class="swatch" style="background:{c["hex"]}"></span>'
-            f'<strong>{c["label"]}</strong> — {c["desc"]}</div>'
-            for c in ANN_COLOURS.values()
-        )
+        ai_events = self.process_log.ai_events
+        ai_rows = "".join([
+            f"<tr><td>{ts}</td><td>{it}</td><td>{model}</td><td>{out} ch</td><td>{acc}</td></tr>"
+            for ts, it, model, out, acc in self._ai_rows(ai_events)
+        ]) or "<tr><td colspan='5'>No AI interactions recorded</td></tr>"
 
         return f"""<!DOCTYPE html><html lang="en">
-<head><meta charset="UTF-8"/><title>{esc(title)}</title></head>
+<head><meta charset="UTF-8"/><title>{title_e}</title></head>
 <body>
 <div class="doc-meta">{"".join(meta_fields)}</div>
-<div class="inline-legend">{legend_items}</div>
+<div class="inline-legend">{_LEGEND_ITEMS_HTML}</div>
 <div class="document-body">{content}</div>
 <div class="page-break"></div>
 <div class="app-h">Appendix A — AI Usage Report</div>
@@ -198,16 +391,15 @@ class PDFExporter:
   <tbody>{ai_rows}</tbody>
 </table>
 <div class="app-sub">Annotation Key</div>
-{ann_legend}
+{_ANN_LEGEND_HTML}
 <div class="app-footer">Generated by Glass Box · {engine} engine · firl.nl · TWFF v0.1</div>
 </body></html>"""
 
     # ── ReportLab ─
 
-    def _reportlab(self, content, title, author, institution) -> bytes:
+    def _reportlab(self, target, content, title, author, institution) -> None:
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
         from reportlab.lib.units import cm
         from reportlab.platypus import (
             HRFlowable,
@@ -219,36 +411,18 @@ class PDFExporter:
             TableStyle,
         )
 
-        buf  = io.BytesIO()
-        doc  = SimpleDocTemplate(buf, pagesize=A4,
+        doc  = SimpleDocTemplate(target, pagesize=A4,
                                  leftMargin=2.8*cm, rightMargin=2.8*cm,
                                  topMargin=2.5*cm,  bottomMargin=2.8*cm,
                                  title=title, author=author)
-        base = getSampleStyleSheet()
-
-        def s(name, **kw):
-            return ParagraphStyle(name, parent=base["Normal"], **kw)
-
-        normal = s("n",  fontName="Times-Roman",    fontSize=11.5, leading=20, spaceAfter=6)
-        h1s    = s("h1", fontName="Helvetica-Bold", fontSize=18,   leading=22, spaceAfter=8)
-        h2s    = s("h2", fontName="Helvetica-Bold", fontSize=13,   leading=17, spaceBefore=14, spaceAfter=4)
-        h3s    = s("h3", fontName="Helvetica-Bold", fontSize=11,   leading=15, spaceBefore=10, spaceAfter=3)
-        meta   = s("m",  fontName="Helvetica",      fontSize=9,    leading=13,
-                   textColor=colors.HexColor("#6b7280"), spaceAfter=3)
-        bq     = s("bq", fontName="Times-Italic",   fontSize=11,   leading=18,
-                   leftIndent=18, textColor=colors.HexColor("#374151"),
-                   backColor=colors.HexColor("#eff6ff"), spaceAfter=10, borderPadding=6)
-        ap_h   = s("ah", fontName="Helvetica-Bold", fontSize=14,   leading=18, spaceAfter=12)
-        ap_sub = s("as", fontName="Helvetica-Bold", fontSize=9,    leading=12,
-                   textColor=colors.HexColor("#6b7280"), spaceAfter=6, spaceBefore=14,
-                   textTransform="uppercase")
-        small  = s("sm", fontName="Times-Italic",   fontSize=8.5,  leading=12,
-                   textColor=colors.HexColor("#9ca3af"), spaceBefore=20)
-        code_s = s("co", fontName="Courier",        fontSize=9,    leading=13,
-                   textColor=colors.HexColor("#6b7280"), spaceAfter=3)
+        st     = _rl_styles()
+        base   = st["base"]
+        normal, h1s, h2s, h3s = st["normal"], st["h1"], st["h2"], st["h3"]
+        meta, bq, small, code_s = st["meta"], st["bq"], st["small"], st["code"]
+        ap_h, ap_sub = st["ap_h"], st["ap_sub"]
 
         story = []
-        now = datetime.datetime.utcnow().strftime("%B %d, %Y")
+        now = datetime.datetime.now(datetime.timezone.utc).strftime("%B %d, %Y")
 
         # Meta block
         story.append(Paragraph(f"<b>Title:</b> {_html_mod.escape(title)}", meta))
@@ -262,10 +436,9 @@ class PDFExporter:
         # Annotation legend bar
         legend_cells = [
             Paragraph(
-                f'<font color="{c["hex"]}">■</font> {c["label"]}',
-                s(f"lg_{k}", fontSize=8.5)
+                f'<font color="{c["hex"]}">■</font> {c["label"]}', st["legend"]
             )
-            for k, c in ANN_COLOURS.items()
+            for c in ANN_COLOURS.values()
         ]
         lt = Table([legend_cells])
         lt.setStyle(TableStyle([
@@ -291,9 +464,9 @@ class PDFExporter:
 
         def _stat(num, lbl):
             t = Table([[
-                Paragraph(f'<font color="#3b82f6" size="14"><b>{num}</b></font>', base["Normal"]),
+                Paragraph(f'<font color="#3b82f6" size="14"><b>{num}</b></font>', base),
             ],[
-                Paragraph(f'<font color="#6b7280" size="7">{lbl.upper()}</font>', base["Normal"]),
+                Paragraph(f'<font color="#6b7280" size="7">{lbl.upper()}</font>', base),
             ]])
             t.setStyle(TableStyle([("ALIGN",(0,0),(-1,-1),"CENTER")]))
             return t
@@ -317,19 +490,14 @@ class PDFExporter:
             f"{self.process_log.session_id[:8]}… · {self.process_log.start_time} UTC", code_s))
 
         story.append(Paragraph("AI Interaction Log", ap_sub))
-        ai_events = [e for e in self.process_log.events if e["type"] == "ai_interaction"]
+        ai_events = self.process_log.ai_events
         if ai_events:
-            hdr = [Paragraph(f"<b>{t}</b>", base["Normal"])
+            hdr = [Paragraph(f"<b>{t}</b>", base)
                    for t in ("Time","Type","Model","Output","Acceptance")]
             rows = [hdr] + [
-                [Paragraph(str(x), base["Normal"]) for x in [
-                    e["timestamp"][11:19],
-                    e.get("meta",{}).get("interaction_type","—"),
-                    e.get("meta",{}).get("model","—"),
-                    f"{e.get('meta',{}).get('output_length','—')} ch",
-                    e.get("meta",{}).get("acceptance","—"),
-                ]]
-                for e in ai_events
+                [Paragraph(ts, base), Paragraph(it, base), Paragraph(model, base),
+                 Paragraph(f"{out} ch", base), Paragraph(acc, base)]
+                for ts, it, model, out, acc in self._ai_rows(ai_events)
             ]
             at = Table(rows, colWidths=[1.8*cm,3*cm,4*cm,2*cm,3.5*cm])
             at.setStyle(TableStyle([
@@ -350,7 +518,7 @@ class PDFExporter:
         for c in ANN_COLOURS.values():
             story.append(Paragraph(
                 f'<font color="{c["hex"]}">■</font>  <b>{c["label"]}</b> — {c["desc"]}',
-                s("ak", fontSize=10, leading=16, spaceAfter=4)
+                st["ann_key"]
             ))
 
         story.append(HRFlowable(width="100%", thickness=0.5,
@@ -359,81 +527,60 @@ class PDFExporter:
             "Generated by Glass Box · ReportLab engine · firl.nl · TWFF v0.1", small))
 
         doc.build(story)
-        return buf.getvalue()
 
     # ── HTML → ReportLab flowables
 
     def _html_to_rl(self, raw: str, normal, h1, h2, h3, bq):
-        from reportlab.lib.styles import getSampleStyleSheet
-        from reportlab.platypus import Paragraph, Spacer
-        base = getSampleStyleSheet()
-
-        # Replace annotation spans with coloured text
-        def repl_span(m):
-            cls  = m.group(1)
-            text = m.group(2)
-            col  = ANN_COLOURS.get(cls, {}).get("hex", "#000000")
-            return f'<font color="{col}">{_html_mod.escape(re.sub(r"<[^>]+>","",text))}</font>'
-
-        processed = re.sub(
-            r'<span[^>]*class="(ann-[a-z]+)"[^>]*>(.*?)</span>',
-            repl_span, raw, flags=re.DOTALL
-        )
-        processed = re.sub(r'\s+', ' ', processed)
+        from reportlab.platypus import Paragraph
 
         story    = []
         tag_map  = {
             "h1": h1, "h2": h2, "h3": h3,
             "p": normal, "blockquote": bq, "li": normal,
         }
-        blocks   = re.split(
-            r'(</?(?:h[123]|p|blockquote|ul|li)>|<br\s*/?>)', processed
-        )
-        cur_tag  = None
-        buf: list[str] = []
-
-        for chunk in blocks:
-            m = re.match(r'<(/?)([a-z0-9]+)\s*/?>', chunk, re.I)
-            if not m:
-                buf.append(chunk)
-                continue
-            closing, tag = m.group(1) == "/", m.group(2).lower()
-            if tag in ("ul",):
-                continue  # handled via li
-            if not closing:
-                cur_tag = tag
-                buf = []
-            else:
-                text = " ".join(buf).strip()
-                buf  = []
-                if text and cur_tag in tag_map:
-                    style = tag_map[cur_tag]
-                    try:
-                        story.append(Paragraph(text, style))
-                    except Exception:
-                        clean = re.sub(r'<[^>]+>', '', text)
-                        story.append(Paragraph(_html_mod.escape(clean), style))
-                cur_tag = None
+
+        for tag, text in _rl_blocks(raw):
+            style = tag_map.get(tag, normal)
+            try:
+                story.append(Paragraph(text, style))
+            except Exception:
+                # Markup ReportLab rejects: keep the (already escaped) text only
+                story.append(Paragraph(_TAG_RE.sub("", text), style))
         return story
 
     # ── Stats helper ─
 
     def _stats(self) -> dict:
-        evts = self.process_log.events
+        log    = self.process_log
+        counts = log.type_counts
         try:
-            start = self._ts(self.process_log.start_time)
-            ends  = [e for e in evts if e["type"] == "session_end"]
-            end   = self._ts(ends[-1]["timestamp"]) if ends else datetime.datetime.utcnow()
+            start = self._ts(log.start_time)
+            if log.last_session_end:
+                end = self._ts(log.last_session_end)
+            else:
+                end = datetime.datetime.now(datetime.timezone.utc)
             mins  = max(1, int((end - start).total_seconds() / 60))
         except Exception:
             mins = 0
         return {
-            "ai":    sum(1 for e in evts if e["type"] == "ai_interaction"),
-            "paste": sum(1 for e in evts if e["type"] == "paste"),
-            "edits": sum(1 for e in evts if e["type"] == "edit"),
+            "ai":    counts["ai_interaction"],
+            "paste": counts["paste"],
+            "edits": counts["edit"],
             "mins":  mins,
         }
 
+    @staticmethod
+    def _ai_rows(ai_events):
+        """(time, type, model, output length, acceptance) per AI interaction, HTML-escaped."""
+        for e in ai_events:
+            m = e.get("meta") or {}
+            yield (e["timestamp"][11:19],
+                   _esc_cell(str(m.get("interaction_type", "—"))),
+                   _esc_cell(str(m.get("model", "—"))),
+                   _esc_cell(str(m.get("output_length", "—"))),
+                   _esc_cell(str(m.get("acceptance", "—"))))
+
     @staticmethod
     def _ts(ts: str) -> datetime.datetime:
-        return datetime.datetime.strptime(ts.rstrip("Z").split(".")[0], "%Y-%m-%dT%H:%M:%S")
+        # C-level parse; spelling out the offset keeps Python < 3.11 working
+        return datetime.datetime.fromisoformat(ts.replace("Z", "+00:00"))
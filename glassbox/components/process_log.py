@@ -10,6 +10,20 @@ import io
 import json
 import uuid
 import zipfile
+from collections import Counter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_UTC = datetime.timezone.utc
+
+
+def _utc_iso() -> str:
+    """Current UTC time as ISO 8601 with a trailing Z (always with microseconds)."""
+    return datetime.datetime.now(_UTC).isoformat(timespec="microseconds")[:-6] + "Z"
+
 
 #  Annotation type registry
 # Single source of truth. Drives: CSS class names, legend labels, log event types.
@@ -51,6 +65,10 @@ class ProcessLog:
 
     Instantiate once per writing session. Call log_event() as the user writes.
     Call export() to produce a .twff ZIP container as bytes.
+
+    Logging is an in-memory list append — nothing is serialized or written to
+    disk until export(), so log_* calls are safe to make inline from UI
+    handlers. Do not queue them: the timestamp is taken at call time.
     """
 
     SPEC_VERSION = "0.1.0"
@@ -60,8 +78,12 @@ class ProcessLog:
         # Per spec: user_id is user-generated, anonymous, rotatable.
         # If none supplied, generate an ephemeral one for this session.
         self.user_id: str = user_id or self._generate_ephemeral_id()
-        self.start_time: str = datetime.datetime.utcnow().isoformat() + "Z"
+        self.start_time: str = _utc_iso()
         self.events: list[dict] = []
+        # Maintained by log_event so stats never need to rescan events
+        self.type_counts: Counter[str] = Counter()
+        self.last_session_end: str | None = None
+        self.ai_events: list[dict] = []
         self._content_source = "content/document.xhtml"
 
         self.log_event("session_start")
@@ -82,11 +104,16 @@ class ProcessLog:
             The event dict that was appended.
         """
         event = {
-            "timestamp": datetime.datetime.utcnow().isoformat() + "Z",
+            "timestamp": _utc_iso(),
             "type": event_type,
             "meta": meta or {},
         }
         self.events.append(event)
+        self.type_counts[event_type] += 1
+        if event_type == "ai_interaction":
+            self.ai_events.append(event)
+        elif event_type == "session_end":
+            self.last_session_end = event["timestamp"]
         return event
 
     def log_checkpoint(self, char_count: int, word_count: int, cursor_position: int) -> dict:
@@ -133,7 +160,7 @@ class ProcessLog:
 
     def end_session(self) -> str:
         """Finalise the session. Returns end_time ISO string."""
-        end_time = datetime.datetime.utcnow().isoformat() + "Z"
+        end_time = _utc_iso()
         self.log_event("session_end")
         return end_time
 
@@ -144,7 +171,7 @@ class ProcessLog:
             "session_id": self.session_id,
             "user_id": self.user_id,
             "start_time": self.start_time,
-            "end_time": end_time or datetime.datetime.utcnow().isoformat() + "Z",
+            "end_time": end_time or _utc_iso(),
             "content_source": self._content_source,
             "events": self.events,
         }
@@ -159,13 +186,30 @@ class ProcessLog:
         Returns:
             Raw bytes of the .twff ZIP file.
         """
+        buf = io.BytesIO()
+        self.export_to(buf, xhtml_content)
+        return buf.getvalue()
+
+    def export_to(self, fileobj, xhtml_content: str) -> None:
+        """
+        Write the TWFF ZIP container straight into a writable binary file
+        object (file on disk, HTTP response stream, ...) without first
+        building it in memory.
+
+        Args:
+            fileobj:       Writable binary file-like object.
+            xhtml_content: The final document as XHTML string.
+        """
         end_time = self.end_session()
         process_log_dict = self.to_dict(end_time)
 
-        # Compute integrity hash of the events array
-        events_json = json.dumps(self.events, sort_keys=True)
+        # Compute integrity hash of the events array. Stays on the stdlib
+        # encoder: SPEC §5.5 defines the hash over its exact output
+        # (fed to the hasher piecewise — no concatenated copy of the log)
         salt = self.session_id
-        integrity_hash = hashlib.sha256((events_json + salt).encode()).hexdigest()
+        h = hashlib.sha256(json.dumps(self.events, sort_keys=True).encode())
+        h.update(salt.encode())
+        integrity_hash = h.hexdigest()
         process_log_dict["_integrity"] = {
             "algorithm": "SHA-256",
             "salt": "session_id",
@@ -175,13 +219,13 @@ class ProcessLog:
 
         manifest = self._build_manifest()
 
-        buf = io.BytesIO()
-        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-            zf.writestr("content/document.xhtml", xhtml_content)
-            zf.writestr("meta/process-log.json", json.dumps(process_log_dict, indent=2))
-            zf.writestr("meta/manifest.xml", manifest)
-        buf.seek(0)
-        return buf.getvalue()
+        # Fast deflate for the text entries; the tiny manifest is stored as-is
+        with zipfile.ZipFile(fileobj, "w") as zf:
+            zf.writestr("content/document.xhtml", xhtml_content,
+                        compress_type=zipfile.ZIP_DEFLATED, compresslevel=1)
+            zf.writestr("meta/process-log.json", self._dump_json(process_log_dict),
+                        compress_type=zipfile.ZIP_DEFLATED, compresslevel=3)
+            zf.writestr("meta/manifest.xml", manifest, compress_type=zipfile.ZIP_STORED)
 
     #  Private helpers ─
 
@@ -194,6 +238,13 @@ class ProcessLog:
         raw = str(uuid.uuid4())
         return "anon-" + hashlib.sha256(raw.encode()).hexdigest()[:12]
 
+    @staticmethod
+    def _dump_json(obj: dict) -> bytes | str:
+        """Compact JSON; orjson when available (much faster on long sessions)."""
+        if orjson is not None:
+            return orjson.dumps(obj)
+        return json.dumps(obj, separators=(",", ":"))
+
     def _build_manifest(self) -> str:
         return (
             '<?xml version="1.0" encoding="UTF-8"?>\n'
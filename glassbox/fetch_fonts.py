@@ -0,0 +1,88 @@
+"""
+fetch_fonts.py — Self-host the Glass Box web fonts
+
+Downloads the Google Fonts stylesheet used by app.py, saves every referenced
+woff2 file under css/fonts/, and writes css/fonts.css pointing at the local
+copies. When css/fonts.css exists, app.py links it instead of Google Fonts,
+removing the fonts.googleapis.com / fonts.gstatic.com round-trips.
+
+Usage:
+    python fetch_fonts.py            # Download fonts into css/fonts/
+    python fetch_fonts.py --clean    # Remove self-hosted fonts (use Google again)
+"""
+import os
+import re
+import shutil
+import sys
+import urllib.request
+
+HERE      = os.path.dirname(os.path.abspath(__file__))
+FONTS_DIR = os.path.join(HERE, "css", "fonts")
+FONTS_CSS = os.path.join(HERE, "css", "fonts.css")
+
+# Keep in sync with _FONTS_URL in app.py
+FONTS_URL = (
+    "https://fonts.googleapis.com/css2"
+    "?family=Atkinson+Hyperlegible:ital,wght@0,400;0,700;1,400"
+    "&family=Crimson+Text:ital,wght@0,400;0,600;1,400"
+    "&display=swap"
+)
+
+# Google serves woff2 only to user agents it recognises as modern browsers
+_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+_WOFF2_URL = re.compile(r"url\((https://fonts\.gstatic\.com/[^)]+\.woff2)\)")
+
+
+def _get(url: str) -> bytes:
+    req = urllib.request.Request(url, headers={"User-Agent": _USER_AGENT})
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        return resp.read()
+
+
+def fetch() -> int:
+    """Download fonts and write css/fonts.css. Returns the number of files saved."""
+    css = _get(FONTS_URL).decode("utf-8")
+    os.makedirs(FONTS_DIR, exist_ok=True)
+
+    saved: dict[str, str] = {}
+    for url in _WOFF2_URL.findall(css):
+        if url in saved:
+            continue
+        # Path segments after the host are unique per face/subset
+        name = "-".join(url.split("/")[4:])
+        with open(os.path.join(FONTS_DIR, name), "wb") as f:
+            f.write(_get(url))
+        saved[url] = f"fonts/{name}"
+
+    css = _WOFF2_URL.sub(lambda m: f"url({saved[m.group(1)]})", css)
+    with open(FONTS_CSS, "w", encoding="utf-8") as f:
+        f.write(css)
+    return len(saved)
+
+
+def clean() -> None:
+    shutil.rmtree(FONTS_DIR, ignore_errors=True)
+    if os.path.exists(FONTS_CSS):
+        os.remove(FONTS_CSS)
+
+
+def main():
+    """CLI entry point."""
+    if "--clean" in sys.argv[1:]:
+        clean()
+        print("✓ Self-hosted fonts removed — Google Fonts will be used")
+        return
+    try:
+        count = fetch()
+    except OSError as exc:
+        print(f"✗ Could not download fonts: {exc}")
+        sys.exit(1)
+    print(f"✓ {count} font files saved to {FONTS_DIR}")
+    print("  Restart app.py to serve them from /css/fonts.css")
+
+
+if __name__ == "__main__":
+    main()
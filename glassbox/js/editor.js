@@ -0,0 +1,223 @@
+/*
+ * editor.js — Glass Box browser-side editor handlers
+ *
+ * Loaded once per page from <head> (see app.py) and cached by the browser.
+ * Exposes the window._gb* functions Python calls via ui.run_javascript and
+ * emits the gb_* events the Editor registers with ui.on.
+ */
+(function() {
+    const ED_SELECTOR = '.q-editor__content[contenteditable="true"]';
+
+    window._gbInsertAnnotated = function({text, css, tooltip}) {
+        const ed = document.querySelector(ED_SELECTOR);
+        if (!ed) return;
+        const span = document.createElement('span');
+        span.className = css;
+        span.setAttribute('data-tooltip', tooltip);
+        span.textContent = text;   // plain text only — XSS safe
+        const sel = window.getSelection();
+        if (sel && sel.rangeCount) {
+            const range = sel.getRangeAt(0);
+            range.collapse(false);
+            range.insertNode(span);
+            range.setStartAfter(span);
+            range.collapse(true);
+            sel.removeAllRanges();
+            sel.addRange(range);
+        } else {
+            ed.appendChild(span);
+        }
+        window._gbContentSync(ed);
+    };
+
+    // Cheap change signal: Python pulls the full HTML only when it needs it
+    window._gbContentSync = function(ed) {
+        window.emitEvent('gb_content_sync', {});
+    };
+
+    // Tally is only needed by the post-export dialog — load it on first use,
+    // not in <head>; later calls just fill in newly mounted embeds
+    window._gbLoadTally = function() {
+        if (typeof Tally !== 'undefined') { Tally.loadEmbeds(); return; }
+        if (document.getElementById('gb-tally-js')) return;  // still loading
+        const s = document.createElement('script');
+        s.id     = 'gb-tally-js';
+        s.src    = 'https://tally.so/embed.js';
+        s.defer  = true;
+        s.onload = function() { Tally.loadEmbeds(); };
+        document.body.appendChild(s);
+    };
+
+    // Unwrap annotation spans off-DOM, then swap the children in once —
+    // one reflow instead of one per span
+    window._gbClearAnnotations = function() {
+        const ed = document.querySelector(ED_SELECTOR);
+        if (!ed) return;
+        const clone = ed.cloneNode(true);
+        const spans = clone.querySelectorAll(
+            '.ann-paraphrase,.ann-generated,.ann-external,.ann-completion');
+        if (!spans.length) return;
+        spans.forEach(span => span.replaceWith(span.textContent));
+        clone.normalize();
+        ed.replaceChildren(...clone.childNodes);
+        window._gbContentSync(ed);
+    };
+
+    function initGB(ed) {
+        // Paste — annotated span at the cursor, no blocking dialogs
+        ed.addEventListener('paste', function(e) {
+            e.preventDefault();
+            const cd  = e.clipboardData || window.clipboardData;
+            const txt = cd.getData('text/plain') || '';
+            if (!txt) return;
+
+            const span = document.createElement('span');
+            span.className = 'ann-external';
+            span.setAttribute('data-tooltip',
+                'External paste — ' + new Date().toISOString());
+            span.textContent = txt;   // plain text only — XSS safe
+
+            const sel = window.getSelection();
+            if (sel && sel.rangeCount) {
+                const range = sel.getRangeAt(0);
+                range.deleteContents();
+                range.insertNode(span);
+                range.setStartAfter(span);
+                range.collapse(true);
+                sel.removeAllRanges();
+                sel.addRange(range);
+            } else {
+                ed.appendChild(span);
+            }
+
+            window.emitEvent('gb_paste', {
+                length:  txt.length,
+                preview: txt.substring(0, 100)
+            });
+
+            // Tell Python the content changed
+            window._gbContentSync(ed);
+        });
+
+        // Focus loss — Python checkpoints pending edits
+        ed.addEventListener('blur', function() {
+            window.emitEvent('gb_blur', {});
+        });
+
+        // Selection capture
+        document.addEventListener('mouseup', function() {
+            const sel = window.getSelection();
+            const txt = sel ? sel.toString().trim() : '';
+            if (txt.length > 0) {
+                window.emitEvent('gb_selection', {text: txt});
+            }
+        });
+
+        // Ghost completion
+        let ghostNode  = null;
+        let ghostTimer = null;
+
+        function removeGhost(notify) {
+            if (!ghostNode) return;
+            if (ghostNode.parentNode) {
+                ghostNode.parentNode.removeChild(ghostNode);
+            }
+            ghostNode = null;
+            // Lets Python stop a completion that is still streaming
+            if (notify) window.emitEvent('gb_ghost_dismiss', {});
+        }
+
+        // Called from Python with the ghost text; an empty string
+        // opens a ghost that _gbAppendGhost fills as tokens stream in
+        window._gbShowGhost = function(text) {
+            removeGhost(false);
+            const sel = window.getSelection();
+            if (!sel || !sel.rangeCount) return;
+            const range = sel.getRangeAt(0).cloneRange();
+            range.collapse(false);   // collapse to cursor end
+
+            ghostNode = document.createElement('span');
+            ghostNode.id = 'gb-ghost';
+            ghostNode.className = 'gb-ghost-text';
+            ghostNode.contentEditable = 'false';
+            ghostNode.setAttribute('aria-hidden', 'true');
+            ghostNode.textContent = text;
+
+            range.insertNode(ghostNode);
+
+            // Restore cursor to before the ghost
+            const r2 = document.createRange();
+            r2.setStartBefore(ghostNode);
+            r2.collapse(true);
+            sel.removeAllRanges();
+            sel.addRange(r2);
+        };
+
+        window._gbAppendGhost = function(chunk) {
+            if (ghostNode) ghostNode.textContent += chunk;
+        };
+
+        window._gbAcceptGhost = function() {
+            if (!ghostNode) return '';
+            const text = ghostNode.textContent;
+            if (!text) { removeGhost(true); return ''; }
+            const parent = ghostNode.parentNode;
+            const textNode = document.createTextNode(text);
+            parent.replaceChild(textNode, ghostNode);
+            ghostNode = null;
+            // Move cursor after accepted text
+            const sel = window.getSelection();
+            const r = document.createRange();
+            r.setStartAfter(textNode);
+            r.collapse(true);
+            sel.removeAllRanges();
+            sel.addRange(r);
+            return text;
+        };
+
+        ed.addEventListener('keydown', function(e) {
+            if (e.key === 'Tab') {
+                e.preventDefault();
+                if (ghostNode) {
+                    const accepted = window._gbAcceptGhost();
+                    if (accepted) {
+                        window.emitEvent('gb_ghost_accepted', {text: accepted});
+                        window._gbContentSync(ed);
+                    }
+                } else {
+                    // Request ghost from Python — trailing debounce so a
+                    // burst of Tab presses sends a single request
+                    clearTimeout(ghostTimer);
+                    ghostTimer = setTimeout(function() {
+                        // Only the tail is prompted — keep in step with
+                        // GHOST_CONTEXT in ollama_client.py
+                        const ctx = (ed.innerText || '').slice(-200);
+                        if (ctx.trim().length >= 8) {
+                            window.emitEvent('gb_ghost_request', {context: ctx});
+                        }
+                    }, 120);
+                }
+            } else if (e.key === 'Escape') {
+                removeGhost(true);
+            } else if (!e.ctrlKey && !e.metaKey && !e.altKey
+                       && e.key.length === 1) {
+                // Regular typing dismisses ghost
+                removeGhost(true);
+            }
+        });
+    }
+
+    // Attach once the editor is mounted, without polling
+    function tryInit() {
+        const ed = document.querySelector(ED_SELECTOR);
+        if (!ed) return false;
+        if (!ed._gbInit) { ed._gbInit = true; initGB(ed); }
+        return true;
+    }
+    if (!tryInit()) {
+        const obs = new MutationObserver(function() {
+            if (tryInit()) obs.disconnect();
+        });
+        obs.observe(document.body, {childList: true, subtree: true});
+    }
+})();
@@ -6,38 +6,258 @@ Provides platform-specific installation guidance.
 
 Usage:
     python setup_weasyprint.py --check        # Check current status
+    python setup_weasyprint.py --check --libs-only  # Native libraries only (no import)
+    python setup_weasyprint.py --check --refresh    # Ignore the cached result (1h)
+    python setup_weasyprint.py --check --deep       # Also import weasyprint (slow)
     python setup_weasyprint.py --setup        # Attempt automatic setup (if supported)
 """
+import functools
+import importlib.metadata
+import importlib.util
+import json
 import os
-import platform
-import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_PY_VERSION = sys.version.split()[0]
+
+# Full check results persist across CLI runs for up to an hour, or until the
+# environment signature (linker cache, DLL dirs, installed weasyprint) changes
+DISK_CACHE_TTL = 3600.0
+_DISK_CACHE = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'twff', 'weasyprint_check.json',
+)
+
+# sys.platform is fixed at build time; platform.system() may shell out to uname
+_PLATFORM_NAMES = {'win32': 'Windows', 'darwin': 'Darwin'}
+
+
+def _system_name() -> str:
+    """Return 'Windows', 'Linux', 'Darwin', ... without calling platform.system()."""
+    if sys.platform.startswith('linux'):
+        return 'Linux'
+    return _PLATFORM_NAMES.get(sys.platform, sys.platform.title())
+
+
+@functools.lru_cache(maxsize=None)
+def _find(lib: str) -> bool:
+    """ctypes.util.find_library(lib) is not None, cached (it may spawn ldconfig/gcc)."""
+    import ctypes.util
+    return ctypes.util.find_library(lib) is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _linux_library_set() -> frozenset | None:
+    """
+    Sonames in the dynamic linker cache, read with a single `ldconfig -p`.
+    None if ldconfig is unavailable (callers fall back to find_library).
+    """
+    import subprocess
+    for exe in ('ldconfig', '/sbin/ldconfig'):
+        try:
+            out = subprocess.run([exe, '-p'], capture_output=True, text=True, check=True).stdout
+        except (OSError, subprocess.CalledProcessError):
+            continue
+        # Entries look like: "\tlibpango-1.0.so.0 (libc6,x86-64) => /usr/lib/..."
+        return frozenset(line.split(None, 1)[0] for line in out.splitlines()[1:] if line.strip())
+    return None
+
+
+def _env_signature(system: str) -> list:
+    """Cheap fingerprint of everything a full check depends on."""
+    def mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except (OSError, TypeError):
+            return None
+    spec = importlib.util.find_spec('weasyprint')
+    return [system, sys.version, mtime('/etc/ld.so.cache'),
+            os.environ.get('WEASYPRINT_DLL_DIRECTORIES', ''),
+            mtime(spec.origin) if spec else None]
+
+
+def _load_disk_cache(sig: list) -> dict | None:
+    try:
+        with open(_DISK_CACHE, encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('sig') != sig or time.time() - cached.get('ts', 0) > DISK_CACHE_TTL:
+        return None
+    return cached.get('result')
+
+
+def _store_disk_cache(sig: list, result: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(_DISK_CACHE), exist_ok=True)
+        with open(_DISK_CACHE, 'w', encoding='utf-8') as f:
+            json.dump({'sig': sig, 'ts': time.time(), 'result': result}, f)
+    except OSError:
+        pass  # caching is best-effort
+
+
+def _find_all(libs: list[str]) -> dict:
+    """{lib: found} for libs, probed concurrently — each lookup mostly waits on a subprocess."""
+    with ThreadPoolExecutor(max_workers=len(libs)) as ex:
+        return dict(zip(libs, ex.map(_find, libs)))
+
+
+def _windows_dll_hits(libs) -> dict:
+    """
+    Libraries found in the configured MSYS2 WEASYPRINT_DLL_DIRECTORIES — one
+    directory listing instead of a LoadLibrary-backed lookup per DLL. Only
+    hits are returned; the rest still need find_library.
+    """
+    present = set()
+    for dll_dir in os.environ.get('WEASYPRINT_DLL_DIRECTORIES', '').split(os.pathsep):
+        if dll_dir and os.path.isdir(dll_dir):
+            present.update(f.lower() for f in os.listdir(dll_dir) if f.lower().endswith('.dll'))
+    return {lib: True for lib in libs
+            if any(f in (f'{lib}.dll', f'lib{lib}.dll') or f.startswith(f'lib{lib}')
+                   for f in present)}
+
+
+def _ldconfig_hits(libs) -> dict:
+    """
+    Libraries listed in the ldconfig cache. Only hits are returned — libs on
+    LD_LIBRARY_PATH (conda, nix, venv-local builds) aren't cached there, so
+    misses still need find_library.
+    """
+    sonames = _linux_library_set() or ()
+    return {lib: True for lib in libs
+            if any(name.startswith(f'lib{lib}.so') for name in sonames)}
+
+
+# Native libraries WeasyPrint needs, by platform name
+_LIBS_BY_PLATFORM = {
+    'Windows': (
+        'gobject-2.0-0',      # GObject
+        'glib-2.0-0',         # GLib
+        'pango-1.0-0',        # Pango
+        'cairo-2',            # Cairo
+        'fontconfig',         # Fontconfig
+    ),
+    'Linux':  ('gobject-2.0', 'pango-1.0', 'cairo'),
+    'Darwin': ('gobject-2.0', 'pango-1.0', 'cairo'),
+}
+
+# Platform name → cheaper lookup tried before find_library
+_FAST_PROBES = {
+    'Windows': _windows_dll_hits,
+    'Linux':   _ldconfig_hits,
+}
+
+# Platform-specific installation instructions, keyed like WeasyPrintChecker.system
+_INSTRUCTIONS = {
+    'Windows': """
+WINDOWS SETUP (Recommended: MSYS2)
+==================================
+1. Download MSYS2 from https://www.msys2.org/
+2. Run the installer and follow the prompts
+3. Open MSYS2 terminal and run:
+   pacman -S mingw-w64-x86_64-pango
+
+4. Close MSYS2, then in Windows cmd/PowerShell:
+   set WEASYPRINT_DLL_DIRECTORIES=C:\\msys64\\mingw64\\bin
+   python -m pip install weasyprint
+
+5. Verify:
+   python setup_weasyprint.py --check
+
+Alternative (Docker):
+   docker pull luca-vercelli/weasyprint
+   See full guide for details.
+""",
+    'Linux': """
+LINUX SETUP
+===========
+Most distributions have Pango/Cairo in standard repos.
+
+Ubuntu/Debian:
+   sudo apt-get install libpango-1.0-0 libcairo2 libgobject-2.0-0
+   python -m pip install weasyprint
+
+Fedora/RHEL:
+   sudo dnf install pango cairo gobject-introspection
+   python -m pip install weasyprint
+
+Verify:
+   python setup_weasyprint.py --check
+""",
+    'Darwin': """
+MACOS SETUP
+===========
+Using Homebrew (recommended):
+   brew install pango cairo
+   python -m pip install weasyprint
+
+Or using conda:
+   conda install -c conda-forge pango cairo
+
+Verify:
+   python setup_weasyprint.py --check
+""",
+}
+
+
+def get_platform_instructions(system: str | None = None) -> str:
+    """Installation instructions for system (default: this machine). Probes nothing."""
+    return _INSTRUCTIONS.get(system or _system_name(),
+                             "Platform not recognized. See WEASYPRINT_SETUP.md")
 
 
 class WeasyPrintChecker:
     """Dependency checker for WeasyPrint on various platforms."""
 
     def __init__(self):
-        self.system = platform.system()  # 'Windows', 'Linux', 'Darwin'
+        self.system = _system_name()  # 'Windows', 'Linux', 'Darwin'
         self.python_exe = sys.executable
+        self._cached_result: dict | None = None
 
-    def check_weasyprint(self) -> dict:
+    def check_weasyprint(self, refresh: bool = False, probe_module: bool = True,
+                         disk_cache: bool = False, deep: bool = False) -> dict:
         """
         Comprehensive check of WeasyPrint and its dependencies.
+        The full result is cached on the checker; pass refresh=True to re-probe.
+        The installed weasyprint version is read from package metadata; only
+        deep=True actually imports it (slow) to prove the native libraries load.
+        With probe_module=False only the native libraries are checked.
+        disk_cache=True also reuses and stores the full result across
+        processes (see DISK_CACHE_TTL).
 
         Returns:
             {
                 'available': bool,
                 'weasyprint_version': str or None,
+                'module_checked': bool,
+                'import_checked': bool,
                 'native_libs': {'lib_name': bool, ...},
                 'missing_libs': [str, ...],
                 'platform': str,
                 'repair_url': str,
             }
         """
+        if refresh:
+            _find.cache_clear()
+            _linux_library_set.cache_clear()
+        elif self._cached_result is not None and (
+                self._cached_result.get('import_checked') or not deep):
+            return self._cached_result
+
+        sig = _env_signature(self.system) + [deep] if disk_cache and probe_module else None
+        if sig and not refresh:
+            cached = _load_disk_cache(sig)
+            if cached is not None:
+                self._cached_result = cached
+                return cached
+
         result = {
             'available': False,
             'weasyprint_version': None,
+            'module_checked': probe_module,
+            'import_checked': probe_module and deep,
             'native_libs': {},
             'missing_libs': [],
             'platform': self.system,
@@ -45,156 +265,97 @@ class WeasyPrintChecker:
         }
 
         # Step 1: Check native library availability first (before importing weasyprint)
-        if self.system == 'Windows':
-            result['native_libs'] = self._check_windows_libs()
-        elif self.system == 'Linux':
-            result['native_libs'] = self._check_linux_libs()
-        elif self.system == 'Darwin':
-            result['native_libs'] = self._check_macos_libs()
+        result['native_libs'] = self._check_libs()
 
         # Identify missing libs
-        result['missing_libs'] = [lib for lib, available in result['native_libs'].items() if not available]
+        missing = [lib for lib, available in result['native_libs'].items() if not available]
 
         # Step 2: Check if weasyprint module imports (only if native libs OK)
-        if not result['missing_libs']:
-            try:
-                import weasyprint
-                result['weasyprint_version'] = weasyprint.__version__
-            except ImportError as e:
-                result['missing_libs'].append(f"weasyprint module: {e}")
-            except Exception as e:
-                result['missing_libs'].append(f"weasyprint import error: {e}")
+        if not probe_module:
+            result['missing_libs'] = missing
+            result['available'] = not missing
+            return result
+        if missing:
+            missing = ["weasyprint (cannot import - missing native libraries)", *missing]
         else:
-            result['missing_libs'].insert(0, "weasyprint (cannot import - missing native libraries)")
+            # Version from the dist-info metadata — no import. Only the import
+            # (hundreds of ms) proves the native libraries actually load, so
+            # that is left to deep=True
+            try:
+                result['weasyprint_version'] = importlib.metadata.version('weasyprint')
+            except importlib.metadata.PackageNotFoundError:
+                missing.append("weasyprint module: not installed")
+            else:
+                if deep:
+                    try:
+                        import weasyprint  # noqa: F401
+                    except ImportError as e:
+                        missing.append(f"weasyprint module: {e}")
+                    except Exception as e:
+                        missing.append(f"weasyprint import error: {e}")
+        result['missing_libs'] = missing
 
         # Overall availability
-        result['available'] = len(result['missing_libs']) == 0
-
-        return result
-
-    def _check_windows_libs(self) -> dict:
-        """Check for Windows native libraries via ctypes.util.find_library()."""
-        import ctypes.util
-        libs_to_check = [
-            'gobject-2.0-0',      # GObject
-            'glib-2.0-0',         # GLib
-            'pango-1.0-0',        # Pango
-            'cairo-2',            # Cairo
-            'fontconfig',         # Fontconfig
-        ]
-        result = {}
-        for lib in libs_to_check:
-            found = ctypes.util.find_library(lib) is not None
-            result[lib] = found
-        return result
+        result['available'] = not missing
 
-    def _check_linux_libs(self) -> dict:
-        """Check for Linux native libraries."""
-        import ctypes.util
-        libs_to_check = ['gobject-2.0', 'pango-1.0', 'cairo']
-        result = {}
-        for lib in libs_to_check:
-            found = ctypes.util.find_library(lib) is not None
-            result[lib] = found
+        self._cached_result = result
+        if sig:
+            _store_disk_cache(sig, result)
         return result
 
-    def _check_macos_libs(self) -> dict:
-        """Check for macOS native libraries via Homebrew or system."""
-        import ctypes.util
-        libs_to_check = ['gobject-2.0', 'pango-1.0', 'cairo']
-        result = {}
-        for lib in libs_to_check:
-            found = ctypes.util.find_library(lib) is not None
-            result[lib] = found
-        return result
+    def _check_libs(self) -> dict:
+        """{lib: found} for this platform's native libraries."""
+        libs = _LIBS_BY_PLATFORM.get(self.system, ())
+        fast = _FAST_PROBES.get(self.system)
+        found = fast(libs) if fast else {}
+        # Anything the platform fast path could not settle goes to find_library
+        missing = [lib for lib in libs if lib not in found]
+        if missing:
+            found.update(_find_all(missing))
+        return {lib: found[lib] for lib in libs}
 
     def report(self, check_result: dict) -> str:
         """Format a human-readable report of the check."""
-        lines = []
-        lines.append("=" * 60)
-        lines.append("WeasyPrint Dependency Check")
-        lines.append("=" * 60)
-        lines.append(f"Platform: {check_result['platform']}")
-        lines.append(f"Python: {sys.version}")
-
+        rule = "=" * 60
         if check_result['weasyprint_version']:
-            lines.append(f"WeasyPrint: ✓ v{check_result['weasyprint_version']}")
+            module = f"✓ v{check_result['weasyprint_version']}"
+            if not check_result.get('import_checked', True):
+                module += " (import not verified — run --deep)"
+        elif not check_result.get('module_checked', True):
+            module = "– not checked (--libs-only)"
         else:
-            lines.append("WeasyPrint: ✗ NOT INSTALLED")
+            module = "✗ NOT INSTALLED"
+
+        out = (f"{rule}\nWeasyPrint Dependency Check\n{rule}\n"
+               f"Platform: {check_result['platform']}\n"
+               f"Python: {_PY_VERSION}\n"
+               f"WeasyPrint: {module}\n")
 
         if check_result['native_libs']:
-            lines.append("\nNative Libraries:")
-            for lib, available in check_result['native_libs'].items():
-                status = "✓" if available else "✗"
-                lines.append(f"  {status} {lib}")
+            out += "\nNative Libraries:\n" + "".join([
+                f"  {'✓' if available else '✗'} {lib}\n"
+                for lib, available in check_result['native_libs'].items()
+            ])
 
-        if check_result['available']:
-            lines.append("\n✓ WeasyPrint is fully functional!")
-        else:
-            lines.append("\n✗ WeasyPrint is NOT fully functional.")
+        if not check_result['available']:
+            out += "\n✗ WeasyPrint is NOT fully functional.\n"
             if check_result['missing_libs']:
-                lines.append("\nMissing components:")
-                for lib in check_result['missing_libs']:
-                    lines.append(f"  • {lib}")
-
-        lines.append(f"\nSetup guide: {check_result['repair_url']}")
-        lines.append("=" * 60)
+                out += "\nMissing components:\n" + "".join([
+                    f"  • {lib}\n" for lib in check_result['missing_libs']
+                ])
+        elif not check_result.get('module_checked', True):
+            out += "\n✓ Native libraries found (WeasyPrint module not checked)\n"
+        elif not check_result.get('import_checked', True):
+            # Only the import loads Pango/Cairo — without it, don't claim it works
+            out += "\n✓ WeasyPrint installed (import not verified — run --deep)\n"
+        else:
+            out += "\n✓ WeasyPrint is fully functional!\n"
 
-        return "\n".join(lines)
+        return out + f"\nSetup guide: {check_result['repair_url']}\n{rule}"
 
     def get_platform_instructions(self) -> str:
         """Return platform-specific installation instructions."""
-        instructions = {
-            'Windows': """
-WINDOWS SETUP (Recommended: MSYS2)
-==================================
-1. Download MSYS2 from https://www.msys2.org/
-2. Run the installer and follow the prompts
-3. Open MSYS2 terminal and run:
-   pacman -S mingw-w64-x86_64-pango
-
-4. Close MSYS2, then in Windows cmd/PowerShell:
-   set WEASYPRINT_DLL_DIRECTORIES=C:\\msys64\\mingw64\\bin
-   python -m pip install weasyprint
-
-5. Verify:
-   python setup_weasyprint.py --check
-
-Alternative (Docker):
-   docker pull luca-vercelli/weasyprint
-   See full guide for details.
-""",
-            'Linux': """
-LINUX SETUP
-===========
-Most distributions have Pango/Cairo in standard repos.
-
-Ubuntu/Debian:
-   sudo apt-get install libpango-1.0-0 libcairo2 libgobject-2.0-0
-   python -m pip install weasyprint
-
-Fedora/RHEL:
-   sudo dnf install pango cairo gobject-introspection
-   python -m pip install weasyprint
-
-Verify:
-   python setup_weasyprint.py --check
-""",
-            'Darwin': """
-MACOS SETUP
-===========
-Using Homebrew (recommended):
-   brew install pango cairo
-   python -m pip install weasyprint
-
-Or using conda:
-   conda install -c conda-forge pango cairo
-
-Verify:
-   python setup_weasyprint.py --check
-""",
-        }
-        return instructions.get(self.system, "Platform not recognized. See WEASYPRINT_SETUP.md")
+        return get_platform_instructions(self.system)
 
     @staticmethod
     def set_environment_windows():
@@ -206,8 +367,24 @@ Verify:
         return False
 
 
+def _run_check(refresh: bool = False, libs_only: bool = False, deep: bool = False):
+    checker = WeasyPrintChecker()
+    result = checker.check_weasyprint(
+        refresh=refresh, probe_module=not libs_only, disk_cache=True, deep=deep)
+    print(checker.report(result))
+    sys.exit(0 if result['available'] else 1)
+
+
 def main():
     """CLI entry point."""
+    # Fast path for the common invocations — no argparse needed
+    argv = sys.argv[1:]
+    if argv == ['--setup']:
+        print(get_platform_instructions())
+        return
+    if argv in ([], ['--check']):
+        _run_check()
+
     import argparse
 
     parser = argparse.ArgumentParser(description="WeasyPrint Dependency Checker")
@@ -219,6 +396,18 @@ def main():
         '--setup', action='store_true',
         help="Show setup instructions for your platform"
     )
+    parser.add_argument(
+        '--libs-only', action='store_true',
+        help="With --check: only probe native libraries, skip importing weasyprint"
+    )
+    parser.add_argument(
+        '--deep', action='store_true',
+        help="With --check: import weasyprint to prove its native libraries load (slow)"
+    )
+    parser.add_argument(
+        '--refresh', action='store_true',
+        help="Ignore the cached result of a previous check and probe again"
+    )
     parser.add_argument(
         '--set-env', action='store_true',
         help="(Windows only) Set WEASYPRINT_DLL_DIRECTORIES environment variable"
@@ -226,11 +415,9 @@ def main():
 
     args = parser.parse_args()
 
-    checker = WeasyPrintChecker()
-
     if args.set_env:
-        if checker.system == 'Windows':
-            if checker.set_environment_windows():
+        if _system_name() == 'Windows':
+            if WeasyPrintChecker.set_environment_windows():
                 print("✓ WEASYPRINT_DLL_DIRECTORIES set for MSYS2")
             else:
                 print("✗ MSYS2 not found at C:\\msys64\\mingw64\\bin")
@@ -238,19 +425,13 @@ def main():
             print("--set-env only applies to Windows")
         return
 
-    if args.check:
-        result = checker.check_weasyprint()
-        print(checker.report(result))
-        sys.exit(0 if result['available'] else 1)
-
-    if args.setup:
-        print(checker.get_platform_instructions())
+    # Instructions only need the platform name — don't build a checker
+    if args.setup and not args.check:
+        print(get_platform_instructions())
         return
 
-    # Default: run check
-    result = checker.check_weasyprint()
-    print(checker.report(result))
-    sys.exit(0 if result['available'] else 1)
+    # --check, or no action given: run the check
+    _run_check(refresh=args.refresh, libs_only=args.libs_only, deep=args.deep)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,3 @@
+"""
+templates — Glass Box document templates.
+"""
@@ -4,75 +4,35 @@ templates/academic_paper.py — Glass Box Academic Paper Template
 Provides the initial HTML content for an academic paper scaffold.
 Designed for: undergraduate/postgraduate essays, research papers, reports.
 
+The HTML lives in academic_paper.html and is only read on first use.
+
 Usage in editor.py:
-    from templates.academic_paper import ACADEMIC_PAPER_TEMPLATE
-    self.editor_ref.value = ACADEMIC_PAPER_TEMPLATE
+    from templates.academic_paper import get_template
+    self.editor_ref.value = get_template()
 """
+import functools
+import os
 
-ACADEMIC_PAPER_TEMPLATE = """
-<h1>[Your Paper Title Here]</h1>
-
-<p style="text-align:center;color:#6b7280;font-size:0.9em;">
-  Author · Institution · Course Code · Date
-</p>
-
-<h2>Abstract</h2>
-<p>
-  A brief summary of your paper: the research question, methodology, key findings,
-  and conclusions. Typically 150–250 words. Write this last.
-</p>
-
-<h2>1. Introduction</h2>
-<p>
-  Introduce the topic and establish its significance. State your thesis or research
-  question clearly. Outline the structure of the paper.
-</p>
+_TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "academic_paper.html")
 
-<h2>2. Background / Literature Review</h2>
-<p>
-  Summarise the existing scholarship relevant to your topic. Identify gaps or
-  tensions in the literature that your paper addresses. Cite sources appropriately.
-</p>
 
-<h2>3. Methodology</h2>
-<p>
-  Describe how you gathered and analysed your evidence or data. Justify your choices.
-  This section may be omitted for purely argumentative essays.
-</p>
+@functools.lru_cache(maxsize=1)
+def get_template() -> str:
+    """
+    Return the template HTML, reading academic_paper.html on first use.
+    Whitespace runs are collapsed once here (the template has no <pre>),
+    so the indented source file stays readable but isn't sent as-is.
+    """
+    with open(_TEMPLATE_PATH, encoding="utf-8") as f:
+        return " ".join(f.read().split())
 
-<h2>4. Analysis / Discussion</h2>
-<p>
-  Present your argument or findings. Structure this section with sub-headings if
-  the paper is long. Support each claim with evidence.
-</p>
 
-<h3>4.1 [First Argument or Finding]</h3>
-<p>Develop your first main point here.</p>
+def __getattr__(name: str):
+    # Backwards compatibility: ACADEMIC_PAPER_TEMPLATE is now loaded lazily
+    if name == "ACADEMIC_PAPER_TEMPLATE":
+        return get_template()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-<h3>4.2 [Second Argument or Finding]</h3>
-<p>Develop your second main point here.</p>
-
-<h2>5. Conclusion</h2>
-<p>
-  Restate your thesis in light of the analysis. Summarise what your paper has
-  established. Suggest implications or directions for future research.
-</p>
-
-<h2>References</h2>
-<p>
-  List all cited sources here in your required citation style (APA, MLA, Chicago,
-  Harvard, etc.). Glass Box records which passages were AI-assisted — you remain
-  responsible for all citations.
-</p>
-
-<blockquote>
-  <p>
-    <strong>Glass Box note:</strong> This document is being recorded as a TWFF session.
-    AI-assisted passages will be highlighted in the exported PDF. Export via
-    <em>Export PDF</em> to produce an annotated copy with an AI usage appendix.
-  </p>
-</blockquote>
-"""
 
 # ── Template metadata ──────────────────────────────────────────────────────
 TEMPLATE_META = {
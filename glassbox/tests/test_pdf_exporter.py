@@ -0,0 +1,36 @@
+"""ReportLab markup built by the HTML walker — no PDF engine needed."""
+from components.pdf_exporter import _HEX_BY_CLASS, _rl_blocks
+
+EXT = f'<font color="{_HEX_BY_CLASS["ann-external"]}">'
+
+
+def test_plain_blocks():
+    assert _rl_blocks("<h1>Title</h1><p>Some <b>bold</b> and <em>it</em></p>") == (
+        ("h1", "Title"),
+        ("p", "Some <b>bold</b> and <i>it</i>"),
+    )
+
+
+def test_annotation_span_closed_at_block_end():
+    blocks = _rl_blocks('<p>a <span class="ann-external">x</p><p>y</span> z</p>')
+    assert blocks == (
+        ("p", f"a {EXT}x</font>"),
+        ("p", f"{EXT}y</font> z"),
+    )
+
+
+def test_inline_run_reopened_in_next_block():
+    assert _rl_blocks("<p>a <b>bold</p><p>more</b> end</p>") == (
+        ("p", "a <b>bold</b>"),
+        ("p", "<b>more</b> end"),
+    )
+
+
+def test_block_inside_span_leaves_no_stray_paragraph():
+    assert _rl_blocks('<span class="ann-external"><p>x</p></span>') == (
+        ("p", f"{EXT}x</font>"),
+    )
+
+
+def test_unclosed_runs_closed_at_end_of_document():
+    assert _rl_blocks("<p>x <i>y") == (("p", "x <i>y</i>"),)